@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import timedelta
 from typing import Optional
 from pydantic import BaseModel
 
-from ...core.auth import verify_password, get_password_hash, create_access_token, verify_token
-from ...core.supabase import get_supabase_client, get_supabase_admin_client
+from ...core.auth import (
+    create_access_token, create_refresh_token, verify_token, revoke_token, use_refresh_token
+)
+from ...core import reference_data
+from ...core.batching import gather_lookups
+from ...repositories import users as users_repo
 from ...models.user import UserCreate, WorkerCreate, UserRole, UserResponse, ClientCreate
 from ...schemas.response import APIResponse, ErrorDetail
 from ...core.config import get_settings
+from ...core.cache import user_cache
+from ...core.serialization import model_response
+from ...core.conditional import conditional_response, weak_etag
+from ...core.metrics import stage_duration_seconds
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -18,6 +26,9 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
     try:
         payload = verify_token(token)
@@ -27,16 +38,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
                 detail="Invalid authentication credentials",
             )
         
-        supabase = get_supabase_client()
-        user = supabase.table("users").select("*").eq("id", payload["sub"]).execute()
+        cached_user = user_cache.get(payload["sub"])
+        if cached_user is not None:
+            return cached_user
+        
+        user = await users_repo.get_user_by_id(payload["sub"])
         
-        if not user.data:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
         
-        return UserResponse(**user.data[0])
+        with stage_duration_seconds.time("user_validation"):
+            user_response = UserResponse(**user)
+        user_cache.set(user_response.id, user_response)
+        return user_response
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -48,12 +65,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
 @router.post("/register/client", response_model=APIResponse[UserResponse])
 async def register_client(user_data: ClientCreate):
     try:
-        # Use admin client for registration
-        supabase = get_supabase_admin_client()
+        # Email and location checks are independent: run them concurrently
+        checks = await gather_lookups(
+            email_taken=users_repo.email_exists(user_data.email),
+            location_ok=reference_data.location_exists(user_data.location_id)
+        )
         
         # Check if user already exists
-        existing_user = supabase.table("users").select("email").eq("email", user_data.email).execute()
-        if existing_user.data:
+        if checks["email_taken"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -63,8 +82,7 @@ async def register_client(user_data: ClientCreate):
             )
         
         # Verify location exists
-        location = supabase.table("locations").select("id").eq("id", user_data.location_id).execute()
-        if not location.data:
+        if not checks["location_ok"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -74,13 +92,9 @@ async def register_client(user_data: ClientCreate):
             )
         
         # Create auth user (auto-confirmar email)
-        auth_response = supabase.auth.admin.create_user({
-            "email": user_data.email,
-            "password": user_data.password,
-            "email_confirm": True  # Auto-confirmar email
-        })
+        auth_user_id = await users_repo.create_auth_user(user_data.email, user_data.password)
         
-        if not auth_response.user:
+        if not auth_user_id:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -91,14 +105,14 @@ async def register_client(user_data: ClientCreate):
         
         # Create user profile (clients don't need verification)
         user_dict = user_data.model_dump(exclude={"password"})
-        user_dict["id"] = auth_response.user.id
+        user_dict["id"] = auth_user_id
         user_dict["is_verified"] = None  # None for clients
         
-        result = supabase.table("users").insert(user_dict).execute()
+        profile = await users_repo.insert_user(user_dict)
         
-        if not result.data:
+        if not profile:
             # Rollback auth user creation if profile creation fails
-            supabase.auth.admin.delete_user(auth_response.user.id)
+            await users_repo.delete_auth_user(auth_user_id)
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -109,7 +123,7 @@ async def register_client(user_data: ClientCreate):
         
         return APIResponse(
             success=True,
-            data=UserResponse(**result.data[0])
+            data=UserResponse(**profile)
         )
         
     except ValueError as e:
@@ -132,12 +146,15 @@ async def register_client(user_data: ClientCreate):
 @router.post("/register/worker", response_model=APIResponse[UserResponse])
 async def register_worker(worker_data: WorkerCreate):
     try:
-        # Use admin client for registration
-        supabase = get_supabase_admin_client()
+        # Email, location and category checks are independent: run them concurrently
+        checks = await gather_lookups(
+            email_taken=users_repo.email_exists(worker_data.email),
+            location_ok=reference_data.location_exists(worker_data.location_id),
+            category_ok=reference_data.category_exists(worker_data.category_id)
+        )
         
         # Check if user already exists
-        existing_user = supabase.table("users").select("email").eq("email", worker_data.email).execute()
-        if existing_user.data:
+        if checks["email_taken"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -147,10 +164,7 @@ async def register_worker(worker_data: WorkerCreate):
             )
         
         # Verify location and category exist
-        location = supabase.table("locations").select("id").eq("id", worker_data.location_id).execute()
-        category = supabase.table("categories").select("id").eq("id", worker_data.category_id).execute()
-        
-        if not location.data or not category.data:
+        if not checks["location_ok"] or not checks["category_ok"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -160,13 +174,9 @@ async def register_worker(worker_data: WorkerCreate):
             )
         
         # Create auth user (auto-confirmar email)
-        auth_response = supabase.auth.admin.create_user({
-            "email": worker_data.email,
-            "password": worker_data.password,
-            "email_confirm": True  # Auto-confirmar email
-        })
+        auth_user_id = await users_repo.create_auth_user(worker_data.email, worker_data.password)
         
-        if not auth_response.user:
+        if not auth_user_id:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -177,14 +187,14 @@ async def register_worker(worker_data: WorkerCreate):
         
         # Create worker profile (workers empiezan sin verificar)
         worker_dict = worker_data.model_dump(exclude={"password"})
-        worker_dict["id"] = auth_response.user.id
+        worker_dict["id"] = auth_user_id
         worker_dict["is_verified"] = False  # Workers empiezan sin verificar hasta que se verifique manualmente
         
-        result = supabase.table("users").insert(worker_dict).execute()
+        profile = await users_repo.insert_user(worker_dict)
         
-        if not result.data:
+        if not profile:
             # Rollback auth user creation if profile creation fails
-            supabase.auth.admin.delete_user(auth_response.user.id)
+            await users_repo.delete_auth_user(auth_user_id)
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -195,7 +205,7 @@ async def register_worker(worker_data: WorkerCreate):
         
         return APIResponse(
             success=True,
-            data=UserResponse(**result.data[0])
+            data=UserResponse(**profile)
         )
         
     except ValueError as e:
@@ -215,148 +225,119 @@ async def register_worker(worker_data: WorkerCreate):
             )
         )
 
-@router.post("/login", response_model=APIResponse[dict])
-async def login(request: LoginRequest):
-    """Simple login endpoint that only requires email and password"""
+def _token_pair(user: UserResponse) -> dict:
+    return {
+        "access_token": create_access_token(data={"sub": user.id, "role": user.role}),
+        "refresh_token": create_refresh_token(user.id, user.role),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "user": user
+    }
+
+def _login_error(code: str, message: str) -> APIResponse:
+    return APIResponse(
+        success=False,
+        error=ErrorDetail(
+            code=code,
+            message=message
+        )
+    )
+
+async def _login(email: str, password: str) -> APIResponse:
+    """
+    Password login shared by /login and /token.
+
+    The profile is fetched by email while Supabase checks the password, so a
+    login costs one round-trip of latency; the profile also warms user_cache.
+    """
     try:
-        supabase = get_supabase_client()
-        
-        # Get user from auth
-        auth_response = supabase.auth.sign_in_with_password({
-            "email": request.email,
-            "password": request.password
-        })
+        results = await gather_lookups(
+            user_id=users_repo.authenticate(email, password),
+            profile=users_repo.get_user_by_email(email)
+        )
+        user_id = results["user_id"]
         
-        if not auth_response.user:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="INVALID_CREDENTIALS",
-                    message="Invalid email or password"
-                )
-            )
+        if not user_id:
+            return _login_error("INVALID_CREDENTIALS", "Invalid email or password")
         
-        # Get user profile
-        user = supabase.table("users").select("*").eq("id", auth_response.user.id).execute()
+        user_data = results["profile"]
+        if not user_data or user_data["id"] != user_id:
+            # Email stored differently in the profile; fall back to the id
+            user_data = await users_repo.get_user_by_id(user_id)
         
-        if not user.data:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="USER_NOT_FOUND",
-                    message="User profile not found"
-                )
-            )
+        if not user_data:
+            return _login_error("USER_NOT_FOUND", "User profile not found")
         
-        user_data = user.data[0]
         user_response = UserResponse(**user_data)
         
-        # Check if worker needs verification
+        # Check if worker needs verification (solo verificamos is_verified, no el email)
         if user_response.needs_verification:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="WORKER_NOT_VERIFIED",
-                    message="Worker account is pending verification"
-                )
-            )
-        
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": user_data["id"], "role": user_data["role"]}
-        )
+            return _login_error("WORKER_NOT_VERIFIED", "Worker account is pending verification")
         
-        return APIResponse(
-            success=True,
-            data={
-                "access_token": access_token,
-                "token_type": "bearer",
-                "user": user_response
-            }
-        )
+        user_cache.set(user_response.id, user_response)
+        return APIResponse(success=True, data=_token_pair(user_response))
         
     except Exception as e:
-        return APIResponse(
-            success=False,
-            error=ErrorDetail(
-                code="LOGIN_ERROR",
-                message=str(e)
-            )
-        )
+        return _login_error("LOGIN_ERROR", str(e))
+
+@router.post("/login", response_model=APIResponse[dict])
+async def login(request: LoginRequest):
+    """Simple login endpoint that only requires email and password"""
+    return await _login(request.email, request.password)
 
 @router.post("/token", response_model=APIResponse[dict])
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """OAuth2 compatible token login, get an access token for future requests"""
+    return await _login(form_data.username, form_data.password)
+
+@router.post("/refresh", response_model=APIResponse[dict])
+async def refresh(request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access/refresh token pair without the
+    password. The refresh token is single use: each call rotates it.
+    """
     try:
-        supabase = get_supabase_client()
-        
-        # Get user from auth (sin verificar email)
-        auth_response = supabase.auth.sign_in_with_password({
-            "email": form_data.username,
-            "password": form_data.password
-        })
-        
-        if not auth_response.user:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="INVALID_CREDENTIALS",
-                    message="Invalid email or password"
-                )
-            )
-        
-        # Get user profile
-        user = supabase.table("users").select("*").eq("id", auth_response.user.id).execute()
-        
-        if not user.data:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="USER_NOT_FOUND",
-                    message="User profile not found"
-                )
-            )
+        payload = await use_refresh_token(request.refresh_token)
+        if not payload:
+            return _login_error("INVALID_TOKEN", "Invalid or expired refresh token")
         
-        user_data = user.data[0]
-        user_response = UserResponse(**user_data)
+        user_response = user_cache.get(payload["sub"])
+        if user_response is None:
+            user_data = await users_repo.get_user_by_id(payload["sub"])
+            if not user_data:
+                return _login_error("USER_NOT_FOUND", "User profile not found")
+            user_response = UserResponse(**user_data)
+            user_cache.set(user_response.id, user_response)
         
-        # Check if worker needs verification (solo verificamos is_verified, no el email)
         if user_response.needs_verification:
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="WORKER_NOT_VERIFIED",
-                    message="Worker account is pending verification"
-                )
-            )
-        
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": user_data["id"], "role": user_data["role"]}
-        )
+            return _login_error("WORKER_NOT_VERIFIED", "Worker account is pending verification")
         
-        return APIResponse(
-            success=True,
-            data={
-                "access_token": access_token,
-                "token_type": "bearer",
-                "user": user_response
-            }
-        )
+        return APIResponse(success=True, data=_token_pair(user_response))
         
     except Exception as e:
+        return _login_error("REFRESH_ERROR", str(e))
+
+@router.get("/me", response_model=APIResponse[UserResponse])
+async def get_me(request: Request, current_user: UserResponse = Depends(get_current_user)):
+    """Get the current user's profile (304 while it is unchanged)"""
+    return conditional_response(
+        request,
+        weak_etag(current_user.model_dump()),
+        lambda: model_response(APIResponse(success=True, data=current_user))
+    )
+
+@router.post("/logout", response_model=APIResponse[dict])
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the current access token"""
+    if not revoke_token(token):
         return APIResponse(
             success=False,
             error=ErrorDetail(
-                code="LOGIN_ERROR",
-                message=str(e)
+                code="INVALID_TOKEN",
+                message="Invalid authentication credentials"
             )
         )
-
-@router.get("/me", response_model=APIResponse[UserResponse])
-async def get_me(current_user: UserResponse = Depends(get_current_user)):
-    """Get the current user's profile"""
     return APIResponse(
         success=True,
-        data=current_user
-    ) 
\ No newline at end of file
+        data={"message": "Logged out"}
+    )
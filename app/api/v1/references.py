@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Any, Dict, List, Optional
 
-from ...core.supabase import get_supabase_client
+from ...core import reference_data
+from ...core.reference_data import ReferenceSnapshot
+from ...core.batching import gather_lookups
+from ...core.conditional import conditional_response, weak_etag
+from ...core.serialization import page_response
+from ...core.worker_search import ensure_worker_index, parse_fields, InvalidSearchError
 from ...models.location import LocationInDB
 from ...models.category import CategoryInDB
 from ...models.user import UserResponse
 from ...schemas.response import APIResponse, ErrorDetail
+from ...schemas.pagination import CursorPage
 from ..v1.auth import get_current_user
 
 router = APIRouter()
 
+def _snapshot_response(request: Request, snapshot: ReferenceSnapshot) -> Response:
+    """Serve pre-serialized reference data, or 304 when the client copy is current"""
+    return conditional_response(
+        request,
+        snapshot.etag,
+        lambda: Response(content=snapshot.body, media_type="application/json"),
+        cache_control="no-cache"
+    )
+
 @router.get("/locations", response_model=APIResponse[List[LocationInDB]])
-async def get_locations():
+async def get_locations(request: Request):
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("locations").select("*").order("name").execute()
+        snapshot = await reference_data.get_locations_snapshot()
         
-        if not result.data:
+        if not len(snapshot):
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -25,10 +39,7 @@ async def get_locations():
                 )
             )
         
-        return APIResponse(
-            success=True,
-            data=[LocationInDB(**location) for location in result.data]
-        )
+        return _snapshot_response(request, snapshot)
     except Exception as e:
         return APIResponse(
             success=False,
@@ -39,12 +50,11 @@ async def get_locations():
         )
 
 @router.get("/categories", response_model=APIResponse[List[CategoryInDB]])
-async def get_categories():
+async def get_categories(request: Request):
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("categories").select("*").order("name").execute()
+        snapshot = await reference_data.get_categories_snapshot()
         
-        if not result.data:
+        if not len(snapshot):
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -53,10 +63,7 @@ async def get_categories():
                 )
             )
         
-        return APIResponse(
-            success=True,
-            data=[CategoryInDB(**category) for category in result.data]
-        )
+        return _snapshot_response(request, snapshot)
     except Exception as e:
         return APIResponse(
             success=False,
@@ -66,15 +73,22 @@ async def get_categories():
             )
         )
 
-@router.get("/workers/search", response_model=APIResponse[List[UserResponse]])
+@router.get("/workers/search", response_model=APIResponse[CursorPage[Dict[str, Any]]])
 async def search_workers(
+    request: Request,
     category_id: str = Query(..., description="Category ID"),
     location_id: str = Query(..., description="Location ID"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort_by: str = Query("average_rating", description="average_rating or ratings_count"),
+    order: str = Query("desc", description="asc or desc"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: WorkerSummary columns)"),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
     Search for available workers by category and location.
-    Only returns verified workers that match the specified category and location.
+    Only returns verified workers that match the specified category and location,
+    served from the in-memory worker index one page at a time.
     """
     try:
         # Verify current user is a client
@@ -87,11 +101,15 @@ async def search_workers(
                 )
             )
         
-        supabase = get_supabase_client()
+        # Reference checks and the index load (only slow on a cold start) are independent
+        lookups = await gather_lookups(
+            category_ok=reference_data.category_exists(category_id),
+            location_ok=reference_data.location_exists(location_id),
+            index=ensure_worker_index()
+        )
         
         # Verify category exists
-        category = supabase.table("categories").select("id").eq("id", category_id).execute()
-        if not category.data:
+        if not lookups["category_ok"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -101,8 +119,7 @@ async def search_workers(
             )
         
         # Verify location exists
-        location = supabase.table("locations").select("id").eq("id", location_id).execute()
-        if not location.data:
+        if not lookups["location_ok"]:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -112,19 +129,30 @@ async def search_workers(
             )
         
         # Search for workers matching criteria
-        workers = supabase.table("users").select("*").eq("role", "worker").eq("category_id", category_id).eq("location_id", location_id).eq("is_verified", True).execute()
-        
-        if not workers.data:
-            return APIResponse(
-                success=True,
-                data=[]  # Return empty list instead of error
+        def render():
+            workers, next_cursor, total = lookups["index"].search(
+                category_id=category_id,
+                location_id=location_id,
+                sort_by=sort_by,
+                order=order,
+                limit=limit,
+                cursor=cursor,
+                fields=parse_fields(fields)
             )
+            return page_response(Dict[str, Any], workers, next_cursor, total)
+        
+        # Mismo índice + misma consulta => misma página: 304 sin buscar ni serializar
+        etag = weak_etag(lookups["index"].version, sorted(request.query_params.multi_items()))
+        return conditional_response(request, etag, render)
         
+    except InvalidSearchError as e:
         return APIResponse(
-            success=True,
-            data=[UserResponse(**worker) for worker in workers.data]
+            success=False,
+            error=ErrorDetail(
+                code="VALIDATION_ERROR",
+                message=str(e)
+            )
         )
-        
     except Exception as e:
         return APIResponse(
             success=False,
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import List
-from ...core.supabase import get_supabase_client
-from ...models.service_request import ServiceRequestCreate, ServiceRequestResponse, ServiceRequestStatus
+import uuid
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
+from typing import Any, Dict, List, Optional, Tuple
+from ...repositories import service_requests as service_requests_repo, service_ratings as service_ratings_repo
+from ...models.service_request import (
+    ServiceRequestCreate, ServiceRequestInDB, ServiceRequestResponse, ServiceRequestStatus, ServiceRequestSummary,
+    ServiceRequestBatchAction, ServiceRequestActionResult,
+    SERVICE_REQUEST_FIELDS, SERVICE_REQUEST_SUMMARY_FIELDS, STATUS_TRANSITIONS
+)
 from ...models.user import UserResponse, UserRole
 from ...schemas.response import APIResponse, ErrorDetail
+from ...schemas.pagination import CursorPage
+from ...core.serialization import model_response, page_response
+from ...core.conditional import conditional_response, weak_etag
+from ...core.projection import InvalidFieldsError, parse_fields, select_columns, typed_rows
+from ...core.cursors import InvalidCursorError, decode_keyset_cursor, encode_keyset_cursor
 from ..v1.auth import get_current_user
 from ...models.rating import ServiceRatingCreate
+from ...chat.hub import chat_hub
+from ...chat import events, history
 
 router = APIRouter()
 
@@ -24,7 +37,6 @@ async def create_service_request(
             )
         )
     try:
-        supabase = get_supabase_client()
         # Insert request
         insert_data = {
             "client_id": current_user.id,
@@ -32,8 +44,8 @@ async def create_service_request(
             "description": request_data.description,
             "status": ServiceRequestStatus.pending.value
         }
-        result = supabase.table("service_requests").insert(insert_data).execute()
-        if not result.data:
+        created = await service_requests_repo.create_service_request(insert_data)
+        if not created:
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -41,7 +53,9 @@ async def create_service_request(
                     message="Failed to create service request"
                 )
             )
-        return APIResponse(success=True, data=ServiceRequestResponse(**result.data[0]))
+        # Aviso al worker por su canal de eventos (se publica en segundo plano)
+        await events.request_created(created)
+        return model_response(APIResponse(success=True, data=ServiceRequestResponse(**created)))
     except Exception as e:
         return APIResponse(
             success=False, 
@@ -51,23 +65,85 @@ async def create_service_request(
             )
         )
 
-@router.get("/requests", response_model=APIResponse[List[ServiceRequestResponse]])
-async def list_service_requests(current_user: UserResponse = Depends(get_current_user)):
-    """Worker views their service requests"""
-    if current_user.role != UserRole.WORKER:
+def parse_statuses(status_filter: Optional[str]) -> List[str]:
+    """Validate a comma separated `status=` value against ServiceRequestStatus"""
+    if not status_filter:
+        return []
+    statuses = [value.strip() for value in status_filter.split(",") if value.strip()]
+    valid = {item.value for item in ServiceRequestStatus}
+    unknown = [value for value in statuses if value not in valid]
+    if unknown:
+        raise ValueError(f"Unknown status: {', '.join(unknown)}")
+    return list(dict.fromkeys(statuses))
+
+@router.get("/requests", response_model=APIResponse[CursorPage[ServiceRequestSummary]])
+async def list_service_requests(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status", description="Comma separated statuses, e.g. pending,accepted"),
+    created_from: Optional[datetime] = Query(None, description="Only requests created at or after this instant"),
+    created_to: Optional[datetime] = Query(None, description="Only requests created before this instant"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma separated columns to return instead of the summary"),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Inbox of the current user, newest first: requests received (workers) or
+    sent (clients). ServiceRequestSummary rows unless `fields` is given.
+    """
+    if current_user.role not in [UserRole.WORKER, UserRole.CLIENT]:
         return APIResponse(
             success=False, 
             error=ErrorDetail(
                 code="UNAUTHORIZED", 
-                message="Only workers can view their service requests"
+                message="Only workers and clients have a service request inbox"
             )
         )
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("service_requests").select("*").eq("worker_id", current_user.id).order("created_at", desc=True).execute()
-        if not result.data:
-            return APIResponse(success=True, data=[])
-        return APIResponse(success=True, data=[ServiceRequestResponse(**req) for req in result.data])
+        statuses = parse_statuses(status_filter)
+        before = decode_keyset_cursor(cursor) if cursor else None
+        columns = list(parse_fields(fields, SERVICE_REQUEST_FIELDS, SERVICE_REQUEST_SUMMARY_FIELDS))
+        # El cursor de la página siguiente se arma con created_at + id
+        if "created_at" not in columns:
+            columns.append("created_at")
+        requests = await service_requests_repo.list_service_requests(
+            UserRole(current_user.role).value,
+            current_user.id,
+            limit + 1,
+            columns=select_columns(columns),
+            before=before,
+            statuses=statuses,
+            created_from=created_from,
+            created_to=created_to
+        )
+        next_cursor = None
+        if len(requests) > limit:
+            requests = requests[:limit]
+            next_cursor = encode_keyset_cursor(requests[-1])
+        def render():
+            if not fields:
+                return page_response(ServiceRequestSummary, requests, next_cursor)
+            # Mismo formato de fechas que la proyección por defecto
+            return page_response(Dict[str, Any], typed_rows(ServiceRequestInDB, requests), next_cursor)
+        
+        # Las filas ya incluyen status/created_at: si no cambiaron, 304 sin serializar
+        return conditional_response(request, weak_etag(fields, requests, next_cursor), render)
+    except InvalidCursorError as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="INVALID_CURSOR", 
+                message=str(e)
+            )
+        )
+    except (InvalidFieldsError, ValueError) as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="VALIDATION_ERROR", 
+                message=str(e)
+            )
+        )
     except Exception as e:
         return APIResponse(
             success=False, 
@@ -77,13 +153,87 @@ async def list_service_requests(current_user: UserResponse = Depends(get_current
             )
         )
 
+@router.get("/requests/counts", response_model=APIResponse[Dict[str, int]])
+async def count_service_requests(
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Requests per status in the current user's inbox (for badges), cached briefly"""
+    if current_user.role not in [UserRole.WORKER, UserRole.CLIENT]:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="UNAUTHORIZED", 
+                message="Only workers and clients have a service request inbox"
+            )
+        )
+    try:
+        counts = await service_requests_repo.get_status_counts(UserRole(current_user.role).value, current_user.id)
+        return APIResponse(
+            success=True, 
+            data={item.value: counts.get(item.value, 0) for item in ServiceRequestStatus}
+        )
+    except Exception as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="FETCH_ERROR", 
+                message=str(e)
+            )
+        )
+
+def _normalize_id(request_id: str) -> Optional[str]:
+    try:
+        return str(uuid.UUID(request_id))
+    except ValueError:
+        return None
+
+async def apply_action(
+    worker_id: str,
+    request_ids: List[str],
+    action: str
+) -> Tuple[List[Dict[str, Any]], List[ServiceRequestActionResult]]:
+    """
+    Move the worker's requests to `action` if STATUS_TRANSITIONS allows it,
+    with one conditional update (plus one status lookup only for the ones
+    that did not change). Returns the updated rows and a result per id.
+    """
+    target = ServiceRequestStatus(action)
+    ids = list(dict.fromkeys(request_ids))
+    normalized = {request_id: _normalize_id(request_id) for request_id in ids}
+    valid_ids = [value for value in dict.fromkeys(normalized.values()) if value]
+    updated = []
+    if valid_ids:
+        updated = await service_requests_repo.transition_service_requests(
+            valid_ids, worker_id, target.value, [source.value for source in STATUS_TRANSITIONS[target]]
+        )
+    changed = {row["id"]: row for row in updated}
+    refused = [value for value in valid_ids if value not in changed]
+    current = await service_requests_repo.get_worker_statuses(refused, worker_id) if refused else {}
+    results = []
+    for request_id in ids:
+        value = normalized[request_id]
+        if value in changed:
+            results.append(ServiceRequestActionResult(id=request_id, success=True, status=changed[value]["status"]))
+        elif value in current:
+            results.append(ServiceRequestActionResult(
+                id=request_id, success=False, status=current[value], error="INVALID_TRANSITION"
+            ))
+        else:
+            results.append(ServiceRequestActionResult(id=request_id, success=False, error="NOT_FOUND"))
+    # Avisar a las salas de chat abiertas (se cierran si deja de estar accepted)
+    for row in updated:
+        await chat_hub.publish_status(row["id"], row["status"])
+    # Y a cliente y worker por su canal de eventos (reemplaza el polling; en segundo plano)
+    await events.requests_status_changed(updated)
+    return updated, results
+
 @router.post("/request/{request_id}/action", response_model=APIResponse[ServiceRequestResponse])
 async def action_service_request(
     request_id: str,
-    action: str = Body(..., embed=True, description="Action: accept, reject, cancel"),
+    action: str = Body(..., embed=True, description="Action: accepted, rejected, cancelled, completed"),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    """Worker accepts/rejects/cancels a request"""
+    """Worker accepts/rejects/cancels/completes a request"""
     if current_user.role != UserRole.WORKER:
         return APIResponse(
             success=False, 
@@ -92,7 +242,7 @@ async def action_service_request(
                 message="Only workers can modify service requests"
             )
         )
-    if action not in [ServiceRequestStatus.accepted, ServiceRequestStatus.rejected, ServiceRequestStatus.cancelled, ServiceRequestStatus.completed]:
+    if action not in STATUS_TRANSITIONS:
         return APIResponse(
             success=False, 
             error=ErrorDetail(
@@ -101,10 +251,17 @@ async def action_service_request(
             )
         )
     try:
-        supabase = get_supabase_client()
-        # Find request and verify ownership
-        req = supabase.table("service_requests").select("*").eq("id", request_id).eq("worker_id", current_user.id).single().execute()
-        if not req.data:
+        # Ownership y transición válida se verifican en el mismo UPDATE
+        updated, results = await apply_action(current_user.id, [request_id], action)
+        if not updated:
+            if results[0].error == "INVALID_TRANSITION":
+                return APIResponse(
+                    success=False, 
+                    error=ErrorDetail(
+                        code="INVALID_TRANSITION", 
+                        message=f"Cannot change a {results[0].status.value} request to {action}"
+                    )
+                )
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -112,17 +269,41 @@ async def action_service_request(
                     message="Service request not found"
                 )
             )
-        # Update status
-        updated = supabase.table("service_requests").update({"status": action}).eq("id", request_id).execute()
-        if not updated.data:
-            return APIResponse(
-                success=False, 
-                error=ErrorDetail(
-                    code="UPDATE_ERROR", 
-                    message="Failed to update service request"
-                )
+        return model_response(APIResponse(success=True, data=ServiceRequestResponse(**updated[0])))
+    except Exception as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="ACTION_ERROR", 
+                message=str(e)
             )
-        return APIResponse(success=True, data=ServiceRequestResponse(**updated.data[0]))
+        )
+
+@router.post("/requests/actions", response_model=APIResponse[List[ServiceRequestActionResult]])
+async def batch_action_service_requests(
+    batch: ServiceRequestBatchAction,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Worker applies one action to many requests; each id gets its own result"""
+    if current_user.role != UserRole.WORKER:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="UNAUTHORIZED", 
+                message="Only workers can modify service requests"
+            )
+        )
+    if batch.action not in STATUS_TRANSITIONS:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="INVALID_ACTION", 
+                message="Invalid action"
+            )
+        )
+    try:
+        _, results = await apply_action(current_user.id, batch.request_ids, batch.action)
+        return model_response(APIResponse(success=True, data=results))
     except Exception as e:
         return APIResponse(
             success=False, 
@@ -140,10 +321,9 @@ async def rate_worker(
 ):
     """Client rates a worker for a completed service and updates worker's average rating"""
     try:
-        supabase = get_supabase_client()
-        # Get service request
-        req = supabase.table("service_requests").select("*").eq("id", service_request_id).single().execute()
-        if not req.data:
+        # Validate, insert and aggregate atomically in the database
+        result = await service_ratings_repo.submit_rating(service_request_id, current_user.id, rating_data.rating)
+        if result["status"] == "not_found":
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -151,7 +331,7 @@ async def rate_worker(
                     message="Service request not found"
                 )
             )
-        if req.data["status"] != "completed":
+        if result["status"] == "invalid_status":
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -159,7 +339,7 @@ async def rate_worker(
                     message="Can only rate completed services"
                 )
             )
-        if req.data["client_id"] != current_user.id:
+        if result["status"] == "forbidden":
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -167,11 +347,7 @@ async def rate_worker(
                     message="Only the client can rate the service"
                 )
             )
-        worker_id = req.data["worker_id"]
-        client_id = req.data["client_id"]
-        # Check if rating already exists
-        existing = supabase.table("service_ratings").select("id").eq("service_request_id", service_request_id).eq("client_id", client_id).execute()
-        if existing.data:
+        if result["status"] == "already_rated":
             return APIResponse(
                 success=False, 
                 error=ErrorDetail(
@@ -179,25 +355,11 @@ async def rate_worker(
                     message="Service already rated"
                 )
             )
-        # Insert rating
-        supabase.table("service_ratings").insert({
-            "service_request_id": service_request_id,
-            "worker_id": worker_id,
-            "client_id": client_id,
-            "rating": rating_data.rating
-        }).execute()
-        # Calculate new average and count
-        ratings = supabase.table("service_ratings").select("rating").eq("worker_id", worker_id).execute()
-        ratings_list = [r["rating"] for r in ratings.data] if ratings.data else []
-        avg = sum(ratings_list) / len(ratings_list) if ratings_list else 0
-        count = len(ratings_list)
-        # Update worker
-        supabase.table("users").update({"average_rating": avg, "ratings_count": count}).eq("id", worker_id).execute()
         return APIResponse(
             success=True, 
             data={
-                "average_rating": avg, 
-                "ratings_count": count
+                "average_rating": result["average_rating"], 
+                "ratings_count": result["ratings_count"]
             }
         )
     except Exception as e:
@@ -207,4 +369,55 @@ async def rate_worker(
                 code="RATING_ERROR", 
                 message=str(e)
             )
-        ) 
\ No newline at end of file
+        ) 
+@router.get("/request/{service_request_id}/messages", response_model=APIResponse[CursorPage[Dict[str, Any]]])
+async def list_service_messages(
+    service_request_id: str,
+    before: Optional[str] = Query(None, description="Message id; returns older messages"),
+    since: Optional[str] = Query(None, description="Message id; returns newer messages"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Chat history of a service request, one page at a time (oldest first within the page)"""
+    try:
+        req = await service_requests_repo.get_service_request(
+            service_request_id, columns=service_requests_repo.PARTICIPANT_COLUMNS
+        )
+        if not req:
+            return APIResponse(
+                success=False, 
+                error=ErrorDetail(
+                    code="NOT_FOUND", 
+                    message="Service request not found"
+                )
+            )
+        if current_user.id not in [req["client_id"], req["worker_id"]]:
+            return APIResponse(
+                success=False, 
+                error=ErrorDetail(
+                    code="FORBIDDEN", 
+                    message="Only the client and the worker can read this chat"
+                )
+            )
+        messages, has_more = await history.page(service_request_id, before, since, limit)
+        next_cursor = None
+        if has_more and messages:
+            # Keep paging in the same direction: newer after `since`, older otherwise
+            next_cursor = messages[-1]["id"] if since else messages[0]["id"]
+        return page_response(Dict[str, Any], messages, next_cursor)
+    except history.InvalidHistoryCursor as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="INVALID_CURSOR", 
+                message=str(e)
+            )
+        )
+    except Exception as e:
+        return APIResponse(
+            success=False, 
+            error=ErrorDetail(
+                code="FETCH_ERROR", 
+                message=str(e)
+            )
+        )
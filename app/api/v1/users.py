@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Any, Dict, List, Optional
 
-from ...core.supabase import get_supabase_client
+from ...core.worker_search import ensure_worker_index, parse_fields, InvalidSearchError
+from ...core.serialization import model_response, page_response
+from ...core.conditional import conditional_response, weak_etag
+from ...repositories import users as users_repo
 from ...models.user import UserResponse, UserUpdate
 from ...schemas.response import APIResponse, ErrorDetail
+from ...schemas.pagination import CursorPage
 from ..v1.auth import get_current_user
 
 router = APIRouter()
 
 @router.get("/me", response_model=APIResponse[UserResponse])
-async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
+async def get_current_user_info(request: Request, current_user: UserResponse = Depends(get_current_user)):
     """
-    Get current user information.
+    Get current user information (304 while it is unchanged).
     """
     try:
-        return APIResponse(
-            success=True,
-            data=current_user
+        return conditional_response(
+            request,
+            weak_etag(current_user.model_dump()),
+            lambda: model_response(APIResponse(success=True, data=current_user))
         )
     except Exception as e:
         return APIResponse(
@@ -36,12 +41,10 @@ async def update_current_user(
     Update current user information.
     """
     try:
-        supabase = get_supabase_client()
-        
         # Update user data
-        result = supabase.table("users").update(user_update.dict(exclude_unset=True)).eq("id", current_user.id).execute()
+        updated = await users_repo.update_user(current_user.id, user_update.dict(exclude_unset=True))
         
-        if not result.data:
+        if not updated:
             return APIResponse(
                 success=False,
                 error=ErrorDetail(
@@ -52,7 +55,7 @@ async def update_current_user(
         
         return APIResponse(
             success=True,
-            data=UserResponse(**result.data[0])
+            data=UserResponse(**updated)
         )
     except Exception as e:
         return APIResponse(
@@ -63,14 +66,20 @@ async def update_current_user(
             )
         )
 
-@router.get("/workers", response_model=APIResponse[List[UserResponse]])
+@router.get("/workers", response_model=APIResponse[CursorPage[Dict[str, Any]]])
 async def list_workers(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user),
     category_id: Optional[str] = None,
-    location_id: Optional[str] = None
+    location_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort_by: str = "average_rating",
+    order: str = "desc",
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: WorkerSummary columns)")
 ):
     """
-    List all verified workers, optionally filtered by category and location.
+    List verified workers page by page, optionally filtered by category and location.
     """
     try:
         # Verify current user is a client
@@ -83,26 +92,30 @@ async def list_workers(
                 )
             )
         
-        supabase = get_supabase_client()
-        query = supabase.table("users").select("*").eq("role", "worker").eq("is_verified", True)
+        index = await ensure_worker_index()
         
-        # Apply filters if provided
-        if category_id:
-            query = query.eq("category_id", category_id)
-        if location_id:
-            query = query.eq("location_id", location_id)
-        
-        result = query.execute()
-        
-        if not result.data:
-            return APIResponse(
-                success=True,
-                data=[]  # Return empty list instead of error
+        def render():
+            workers, next_cursor, total = index.search(
+                category_id=category_id,
+                location_id=location_id,
+                sort_by=sort_by,
+                order=order,
+                limit=limit,
+                cursor=cursor,
+                fields=parse_fields(fields)
             )
+            return page_response(Dict[str, Any], workers, next_cursor, total)
         
+        # Mismo índice + misma consulta => misma página: 304 sin buscar ni serializar
+        etag = weak_etag(index.version, sorted(request.query_params.multi_items()))
+        return conditional_response(request, etag, render)
+    except InvalidSearchError as e:
         return APIResponse(
-            success=True,
-            data=[UserResponse(**worker) for worker in result.data]
+            success=False,
+            error=ErrorDetail(
+                code="VALIDATION_ERROR",
+                message=str(e)
+            )
         )
     except Exception as e:
         return APIResponse(
@@ -1,36 +1,99 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import Dict, List
-from ...core.supabase import get_supabase_client
+from typing import Any, Dict, Optional, Sequence
+from ...repositories import service_requests as service_requests_repo
 from ...models.user import UserResponse
 from ...models.service_request import ServiceRequestStatus
+from ...core.config import get_settings
 from ..v1.auth import get_current_user
+from ...chat.hub import ChatConnection, ConnectionLimitError, chat_hub, user_room
+from ...chat.room_state import get_room_status, set_room_status
+from ...chat.persistence import build_message, message_writer
+from ...chat import events, history
 import json
 
 router = APIRouter()
-
-active_connections: Dict[str, List[WebSocket]] = {}
+settings = get_settings()
 
 async def get_service_request(service_request_id: str):
-    supabase = get_supabase_client()
-    req = supabase.table("service_requests").select("*").eq("id", service_request_id).single().execute()
-    return req.data if req.data else None
+    return await service_requests_repo.get_service_request(
+        service_request_id, columns=service_requests_repo.PARTICIPANT_COLUMNS
+    )
+
+async def get_history_frame(
+    service_request_id: str,
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Any = None
+) -> Dict[str, Any]:
+    """One bounded page of history: the latest messages, or those before/since a message id"""
+    try:
+        messages, has_more = await history.page(service_request_id, before, since, limit)
+    except history.InvalidHistoryCursor:
+        return {"error": "INVALID_CURSOR"}
+    frame = {"history": messages, "has_more": has_more}
+    if since:
+        frame["since"] = since
+    elif before:
+        frame["before"] = before
+    return frame
+
+CONTROL_TYPES = ("history", "ping", "pong")
+EVENT_CONTROL_TYPES = ("events", "ping", "pong")
 
-async def get_service_messages(service_request_id: str):
-    supabase = get_supabase_client()
-    result = supabase.table("service_messages").select("*").eq("service_request_id", service_request_id).order("created_at").execute()
-    return result.data if result.data else []
+def parse_command(data: str, types: Sequence[str] = CONTROL_TYPES) -> Optional[Dict[str, Any]]:
+    """
+    Control frames: `{"type": "history", "before"|"since": id, "limit": n}` and
+    `{"type": "ping"|"pong"}` (`{"type": "events", "since": id}` on the event
+    channel). Anything else is a chat message.
+    """
+    if not data.startswith("{"):
+        return None
+    try:
+        command = json.loads(data)
+    except ValueError:
+        return None
+    if isinstance(command, dict) and command.get("type") in types:
+        return command
+    return None
+
+async def get_events_frame(user_id: str, since: Any) -> Dict[str, Any]:
+    try:
+        return await events.replay(user_id, since)
+    except events.InvalidEventCursor:
+        return {"error": "INVALID_CURSOR"}
+
+def check_inbound(connection: ChatConnection, data: str) -> Optional[Dict[str, Any]]:
+    """
+    Error frame for an inbound frame that must be rejected, None if it can be
+    processed. Every frame (control frames included) is charged to the
+    connection bucket before it is even parsed.
+    """
+    metrics = chat_hub.room_metrics(connection.room_id)
+    if len(data) > settings.CHAT_MAX_MESSAGE_BYTES or len(data.encode()) > settings.CHAT_MAX_MESSAGE_BYTES:
+        metrics.oversized += 1
+        return {"error": "MESSAGE_TOO_LARGE", "max_bytes": settings.CHAT_MAX_MESSAGE_BYTES}
+    if not connection.inbound.consume():
+        metrics.rate_limited += 1
+        return {"error": "RATE_LIMITED", "scope": "connection", "retry_after": round(connection.inbound.retry_after(), 3)}
+    return None
+
+def check_room(connection: ChatConnection) -> Optional[Dict[str, Any]]:
+    """Error frame when a chat message exceeds the room's shared bucket"""
+    room = chat_hub.room_limit(connection.room_id)
+    if room.consume():
+        return None
+    # The frame is rejected as a whole: don't charge the sender's own bucket
+    connection.inbound.refund()
+    chat_hub.room_metrics(connection.room_id).rate_limited += 1
+    return {"error": "RATE_LIMITED", "scope": "room", "retry_after": round(room.retry_after(), 3)}
 
 async def save_message(service_request_id: str, sender_id: str, message: str):
-    supabase = get_supabase_client()
-    data = {
-        "service_request_id": service_request_id,
-        "sender_id": sender_id,
-        "message": message
-    }
-    supabase.table("service_messages").insert(data).execute()
+    row = build_message(service_request_id, sender_id, message)
+    await message_writer.persist(row)
+    return row
 
 @router.websocket("/ws/services/{service_request_id}/chat")
-async def websocket_chat(websocket: WebSocket, service_request_id: str, token: str):
+async def websocket_chat(websocket: WebSocket, service_request_id: str, token: str, since: Optional[str] = None):
     await websocket.accept()
     # Validar usuario por token
     try:
@@ -49,29 +112,112 @@ async def websocket_chat(websocket: WebSocket, service_request_id: str, token: s
         await websocket.send_json({"error": "FORBIDDEN"})
         await websocket.close()
         return
-    # Enviar historial
-    messages = await get_service_messages(service_request_id)
-    await websocket.send_json({"history": messages})
-    # Registrar conexión
-    if service_request_id not in active_connections:
-        active_connections[service_request_id] = []
-    active_connections[service_request_id].append(websocket)
+    set_room_status(service_request_id, req["status"])
+    # Registrar conexión y enviar la última página de historial
+    # (o solo lo nuevo desde `since` si el cliente se reconecta)
+    try:
+        connection = await chat_hub.join(service_request_id, websocket, user.id)
+    except ConnectionLimitError:
+        await websocket.send_json({"error": "TOO_MANY_CONNECTIONS"})
+        await websocket.close(code=1013)
+        return
     try:
+        connection.send_json(await get_history_frame(service_request_id, since=since))
         while True:
             data = await websocket.receive_text()
-            # Revalidar status antes de guardar/enviar
-            req = await get_service_request(service_request_id)
-            if req["status"] != ServiceRequestStatus.accepted:
-                await websocket.send_json({"error": "CHAT_DISABLED"})
-                await websocket.close()
+            connection.touch()
+            # Límites de tamaño y frecuencia (también para ping/pong): se rechaza con un frame de error sin tocar la base
+            command = None
+            rejection = check_inbound(connection, data)
+            if rejection is None:
+                command = parse_command(data)
+                if command is None:
+                    rejection = check_room(connection)
+            if rejection is not None:
+                connection.violations += 1
+                connection.send_json(rejection)
+                if connection.violations >= settings.CHAT_MAX_VIOLATIONS:
+                    await connection.close(code=1008)
+                    break
+                continue
+            connection.violations = 0
+            # Heartbeat opcional (CHAT_IDLE_TIMEOUT > 0): el servidor envía {"type": "ping"} y cualquier frame (o el pong) mantiene viva la conexión
+            if command is not None and command["type"] == "pong":
+                continue
+            if command is not None and command["type"] == "ping":
+                connection.send_json({"type": "pong"})
+                continue
+            if command is not None:
+                connection.send_json(await get_history_frame(
+                    service_request_id,
+                    before=command.get("before"),
+                    since=command.get("since"),
+                    limit=command.get("limit")
+                ))
+                continue
+            # Revalidar status antes de guardar/enviar (cacheado por sala; los cambios llegan por push)
+            if await get_room_status(service_request_id) != ServiceRequestStatus.accepted:
+                connection.send_json({"error": "CHAT_DISABLED"})
                 break
-            # Guardar mensaje
-            await save_message(service_request_id, user.id, data)
-            msg_obj = {"sender_id": user.id, "message": data}
+            # Guardar mensaje (write-behind salvo CHAT_PERSISTENCE_MODE=sync)
+            msg_obj = await save_message(service_request_id, user.id, data)
             # Reenviar a todos los conectados a este chat
-            for conn in active_connections[service_request_id]:
-                await conn.send_json(msg_obj)
+            await chat_hub.broadcast(service_request_id, msg_obj)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Siempre liberar la conexión, sea cual sea el error
+        await chat_hub.leave(connection)
+
+@router.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, token: str, since: Optional[str] = None):
+    """
+    Per-user push channel: service request lifecycle events and new-request
+    alerts. Clients resume with `since=<last event id>`; events may arrive
+    twice around a reconnect, so they should be deduplicated by id.
+    """
+    await websocket.accept()
+    try:
+        user = await get_current_user(token)
+    except Exception:
+        await websocket.send_json({"error": "UNAUTHORIZED"})
+        await websocket.close()
+        return
+    try:
+        connection = await chat_hub.join(user_room(user.id), websocket, user.id)
+    except ConnectionLimitError:
+        await websocket.send_json({"error": "TOO_MANY_CONNECTIONS"})
+        await websocket.close(code=1013)
+        return
+    try:
+        # Ya suscripto: lo que se publique desde ahora llega en vivo, lo anterior por replay
+        if since is not None:
+            connection.send_json(await get_events_frame(user.id, since))
+        while True:
+            data = await websocket.receive_text()
+            connection.touch()
+            command = None
+            rejection = check_inbound(connection, data)
+            if rejection is None:
+                command = parse_command(data, EVENT_CONTROL_TYPES)
+                if command is None:
+                    rejection = {"error": "UNSUPPORTED_FRAME"}
+            if rejection is not None:
+                connection.violations += 1
+                connection.send_json(rejection)
+                if connection.violations >= settings.CHAT_MAX_VIOLATIONS:
+                    await connection.close(code=1008)
+                    break
+                continue
+            connection.violations = 0
+            if command["type"] == "pong":
+                continue
+            if command["type"] == "ping":
+                connection.send_json({"type": "pong"})
+                continue
+            # Página siguiente del replay cuando has_more era true
+            connection.send_json(await get_events_frame(user.id, command.get("since")))
     except WebSocketDisconnect:
-        active_connections[service_request_id].remove(websocket)
-        if not active_connections[service_request_id]:
-            del active_connections[service_request_id] 
\ No newline at end of file
+        pass
+    finally:
+        await chat_hub.leave(connection)
@@ -0,0 +1,3 @@
+"""
+Real-time chat infrastructure for service requests
+"""
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from ..core.config import get_settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed for CHAT_BROKER=redis
+    aioredis = None
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Called with (room_id, serialized frame) for every message to fan out locally
+Deliver = Callable[[str, str], object]
+
+class ChatBroker:
+    """
+    Room fan-out transport between processes.
+
+    The hub publishes every serialized frame here instead of delivering it
+    directly; the broker hands it back through `deliver` in every process
+    that has local members in the room (including the publisher).
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def subscribe(self, room_id: str) -> None:
+        """Start receiving frames for a room that gained its first local member"""
+
+    async def unsubscribe(self, room_id: str) -> None:
+        """Stop receiving frames for a room whose last local member left"""
+
+    async def publish(self, room_id: str, text: str) -> None:
+        raise NotImplementedError
+
+class InProcessBroker(ChatBroker):
+    """Single-process backend: publishing is a direct local delivery"""
+
+    async def publish(self, room_id: str, text: str) -> None:
+        if self._deliver is not None:
+            self._deliver(room_id, text)
+
+class RedisBroker(ChatBroker):
+    """Redis pub/sub backend with one channel per room, for multiple workers or replicas"""
+
+    def __init__(self, url: str, channel_prefix: str = "chat:"):
+        super().__init__()
+        if aioredis is None:
+            raise RuntimeError("CHAT_BROKER=redis requires the 'redis' package")
+        self._url = url
+        self._prefix = channel_prefix
+        self._redis = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _channel(self, room_id: str) -> str:
+        return self._prefix + room_id
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        self._redis = aioredis.from_url(self._url, decode_responses=True)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+        await super().stop()
+
+    async def subscribe(self, room_id: str) -> None:
+        await self._pubsub.subscribe(self._channel(room_id))
+
+    async def unsubscribe(self, room_id: str) -> None:
+        await self._pubsub.unsubscribe(self._channel(room_id))
+
+    async def publish(self, room_id: str, text: str) -> None:
+        await self._redis.publish(self._channel(room_id), text)
+
+    async def _read_loop(self) -> None:
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Chat broker read failed; retrying")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            room_id = message["channel"][len(self._prefix):]
+            try:
+                self._deliver(room_id, message["data"])
+            except Exception:
+                logger.exception("Chat delivery failed for room %s", room_id)
+
+def create_broker() -> ChatBroker:
+    if settings.CHAT_BROKER == "redis":
+        if not settings.CHAT_REDIS_URL:
+            raise RuntimeError("CHAT_BROKER=redis requires CHAT_REDIS_URL")
+        return RedisBroker(settings.CHAT_REDIS_URL)
+    return InProcessBroker()
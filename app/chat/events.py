@@ -0,0 +1,112 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+from ..core.background import BatchQueue, PeriodicTask
+from ..core.config import get_settings
+from ..repositories import user_events as user_events_repo
+from .hub import chat_hub, user_room
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+REQUEST_CREATED = "request.created"
+REQUEST_STATUS = "request.status"
+
+Event = Tuple[str, str, Dict[str, Any]]
+
+class InvalidEventCursor(ValueError):
+    """Raised for a `since` value that is not an event id"""
+
+def event_frame(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "event",
+        "id": row["id"],
+        "event": row["type"],
+        "data": row["payload"],
+        "created_at": row["created_at"]
+    }
+
+async def publish(events: List[Event]) -> None:
+    """
+    Store `(user_id, type, payload)` events, then push each one to its user's
+    channel. Storing first gives every event the id clients resume from.
+
+    Best effort: a failure is logged and never reaches the caller, whose
+    change is already committed; clients catch up on their next replay.
+    """
+    try:
+        rows = await user_events_repo.insert_events([
+            {"user_id": user_id, "type": event_type, "payload": payload}
+            for user_id, event_type, payload in events
+        ])
+        for row in rows:
+            await chat_hub.broadcast(user_room(row["user_id"]), event_frame(row))
+    except Exception:
+        logger.exception("Failed to publish %d user events", len(events))
+
+# Routes only enqueue; events are stored and pushed in queue order, several per insert
+event_queue: BatchQueue[Event] = BatchQueue(
+    "user events",
+    publish,
+    batch_size=settings.USER_EVENTS_BATCH_SIZE,
+    queue_size=settings.USER_EVENTS_QUEUE_SIZE
+)
+
+async def submit(events: List[Event]) -> None:
+    """Publish in the background, or inline before startup or when the queue is full"""
+    if not event_queue.offer(events):
+        await publish(events)
+
+async def request_created(request: Dict[str, Any]) -> None:
+    """New-request alert for the worker"""
+    await submit([(request["worker_id"], REQUEST_CREATED, {
+        "service_request_id": request["id"],
+        "client_id": request["client_id"],
+        "status": request["status"]
+    })])
+
+async def requests_status_changed(requests: List[Dict[str, Any]]) -> None:
+    """Lifecycle events for both sides of each request, stored in one insert"""
+    batch: List[Event] = []
+    for request in requests:
+        payload = {"service_request_id": request["id"], "status": request["status"]}
+        batch.append((request["client_id"], REQUEST_STATUS, payload))
+        batch.append((request["worker_id"], REQUEST_STATUS, payload))
+    if batch:
+        await submit(batch)
+
+def parse_cursor(since: Any) -> int:
+    try:
+        cursor = int(since)
+    except (TypeError, ValueError):
+        raise InvalidEventCursor(since)
+    if cursor < 0:
+        raise InvalidEventCursor(since)
+    return cursor
+
+async def replay(user_id: str, since: Any) -> Dict[str, Any]:
+    """Frame with the events after `since` (oldest first, one bounded page)"""
+    cursor = parse_cursor(since)
+    limit = settings.CHAT_EVENTS_REPLAY_LIMIT
+    rows = await user_events_repo.list_events_after(user_id, cursor, limit + 1)
+    return {
+        "type": "events",
+        "events": [event_frame(row) for row in rows[:limit]],
+        "has_more": len(rows) > limit
+    }
+
+async def prune_events() -> int:
+    """Delete events older than the replay retention window and return how many"""
+    deleted = await user_events_repo.prune_events(settings.USER_EVENTS_RETENTION_DAYS)
+    if deleted:
+        logger.info("Pruned %d user events", deleted)
+    return deleted
+
+_prune = PeriodicTask(prune_events, settings.USER_EVENTS_PRUNE_INTERVAL_SECONDS, "User event pruning failed")
+
+def start_event_pruning() -> None:
+    """Schedule the periodic event cleanup (disabled when the interval is 0)"""
+    _prune.start()
+
+async def stop_event_pruning() -> None:
+    await _prune.stop()
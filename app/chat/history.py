@@ -0,0 +1,162 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import get_settings
+from ..repositories import service_messages as service_messages_repo
+from .persistence import message_writer
+
+settings = get_settings()
+
+Page = Tuple[List[Dict[str, Any]], bool]
+
+class InvalidHistoryCursor(ValueError):
+    """Raised when a before/since message id does not belong to the room"""
+
+class RoomHistory:
+    """
+    Ring buffer with the most recent messages of a room, oldest first.
+
+    It exists while the room has local members: the hub records every
+    delivered message and the first DB page seeds what came before.
+    """
+
+    def __init__(self, maxlen: int):
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self.seeded = False
+        # True while the buffer holds the room's whole history
+        self.complete = False
+
+    def append(self, message: Dict[str, Any]) -> None:
+        if len(self.messages) == self.messages.maxlen:
+            self.complete = False
+        self.messages.append(message)
+
+    def seed(self, rows: List[Dict[str, Any]], complete: bool) -> None:
+        # Messages recorded while the DB page was loading are the newest ones
+        live = list(self.messages)
+        live_ids = {message["id"] for message in live}
+        merged = [row for row in rows if row["id"] not in live_ids] + live
+        self.messages = deque(merged, maxlen=self.messages.maxlen)
+        self.complete = complete and len(merged) <= self.messages.maxlen
+        self.seeded = True
+
+    def index_of(self, message_id: str) -> Optional[int]:
+        for index, message in enumerate(self.messages):
+            if message["id"] == message_id:
+                return index
+        return None
+
+_histories: Dict[str, RoomHistory] = {}
+
+def clamp_limit(limit: Any) -> int:
+    if not isinstance(limit, int) or limit <= 0:
+        return settings.CHAT_HISTORY_PAGE_SIZE
+    return max(1, min(limit, settings.CHAT_HISTORY_MAX_PAGE_SIZE))
+
+def open_room(room_id: str) -> None:
+    if room_id not in _histories:
+        _histories[room_id] = RoomHistory(settings.CHAT_HISTORY_BUFFER_SIZE)
+
+def drop_room(room_id: str) -> None:
+    _histories.pop(room_id, None)
+
+def has_room(room_id: str) -> bool:
+    return room_id in _histories
+
+def record(room_id: str, message: Dict[str, Any]) -> None:
+    history = _histories.get(room_id)
+    if history is not None:
+        history.append(message)
+
+def _seeded(room_id: str) -> Optional[RoomHistory]:
+    history = _histories.get(room_id)
+    return history if history is not None and history.seeded else None
+
+def _order_key(message: Dict[str, Any]) -> Tuple[str, str]:
+    # ISO UTC timestamps sort correctly as strings, whatever their fraction digits
+    return message["created_at"], message["id"]
+
+def _with_pending(room_id: str, rows: List[Dict[str, Any]], after: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    DB rows (oldest first) plus the room's messages still queued for
+    write-behind, newer than `after` when given. Without a room buffer these
+    are only visible here until their batch is flushed.
+    """
+    pending = message_writer.pending(room_id)
+    if not pending:
+        return rows
+    seen = {row["id"] for row in rows}
+    merged = rows + [
+        message for message in pending
+        if message["id"] not in seen and (after is None or _order_key(message) > _order_key(after))
+    ]
+    merged.sort(key=_order_key)
+    return merged
+
+async def _resolve_cursor(room_id: str, message_id: str) -> Dict[str, Any]:
+    # A message the client just received may not have been flushed yet
+    cursor = message_writer.pending_message(message_id) or await service_messages_repo.get_message(message_id)
+    if not cursor or cursor["service_request_id"] != room_id:
+        raise InvalidHistoryCursor("Unknown message id for this chat")
+    return cursor
+
+async def latest(room_id: str, limit: int) -> Page:
+    """The newest `limit` messages (oldest first) and whether older ones exist"""
+    history = _seeded(room_id)
+    if history is not None and (len(history.messages) >= limit or history.complete):
+        messages = list(history.messages)
+        return messages[-limit:], len(messages) > limit or not history.complete
+    rows = await service_messages_repo.list_messages_before(room_id, limit + 1)
+    merged = _with_pending(room_id, list(reversed(rows[:limit])))
+    has_more = len(rows) > limit or len(merged) > limit
+    page = merged[-limit:]
+    unseeded = _histories.get(room_id)
+    if unseeded is not None and not unseeded.seeded:
+        unseeded.seed(page, complete=not has_more)
+    return page, has_more
+
+async def before(room_id: str, message_id: str, limit: int) -> Page:
+    """Up to `limit` messages older than `message_id` (oldest first) and whether more remain"""
+    history = _seeded(room_id)
+    cursor = None
+    if history is not None:
+        index = history.index_of(message_id)
+        if index is not None:
+            cursor = history.messages[index]
+            if index >= limit or history.complete:
+                older = list(history.messages)[:index]
+                return older[-limit:], len(older) > limit or not history.complete
+    if cursor is None:
+        cursor = await _resolve_cursor(room_id, message_id)
+    rows = await service_messages_repo.list_messages_before(room_id, limit + 1, before=cursor)
+    return list(reversed(rows[:limit])), len(rows) > limit
+
+async def since(room_id: str, message_id: str, limit: int) -> Page:
+    """Up to `limit` messages newer than `message_id` (oldest first) and whether more remain"""
+    history = _seeded(room_id)
+    if history is not None:
+        index = history.index_of(message_id)
+        if index is not None:
+            newer = list(history.messages)[index + 1:]
+            return newer[:limit], len(newer) > limit
+    cursor = await _resolve_cursor(room_id, message_id)
+    rows = await service_messages_repo.list_messages_after(room_id, cursor, limit + 1)
+    if len(rows) > limit:
+        # Queued messages are newer than what is stored: they come with a later page
+        return rows[:limit], True
+    newer = _with_pending(room_id, rows, after=cursor)
+    return newer[:limit], len(newer) > limit
+
+async def page(
+    room_id: str,
+    before_id: Optional[str] = None,
+    since_id: Optional[str] = None,
+    limit: Any = None
+) -> Page:
+    """Dispatch a history request: newer than `since_id`, older than `before_id`, or the latest"""
+    limit = clamp_limit(limit)
+    if since_id:
+        return await since(room_id, since_id, limit)
+    if before_id:
+        return await before(room_id, before_id, limit)
+    return await latest(room_id, limit)
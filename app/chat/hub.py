@@ -0,0 +1,393 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from ..core.config import get_settings
+from ..core.metrics import Gauge, register_collector
+from .broker import ChatBroker, InProcessBroker
+from .limits import TokenBucket
+from .room_state import set_room_status
+from . import history
+from ..models.service_request import ServiceRequestStatus
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+# Status frames are produced only by ChatHub.publish_status, always with this prefix
+_STATUS_FRAME_PREFIX = '{"type": "status"'
+_PING_FRAME = json.dumps({"type": "ping"})
+
+# Per-user event channels share the hub with chat rooms but keep no chat history
+USER_ROOM_PREFIX = "user:"
+
+def user_room(user_id: str) -> str:
+    return USER_ROOM_PREFIX + user_id
+
+def is_user_room(room_id: str) -> bool:
+    return room_id.startswith(USER_ROOM_PREFIX)
+
+# (label, largest size) of the buckets rooms are counted in by local connections
+ROOM_SIZE_BUCKETS = (("1", 1), ("2", 2), ("3-5", 5), ("6+", None))
+
+def room_size_bucket(connections: int) -> str:
+    for label, upper in ROOM_SIZE_BUCKETS:
+        if upper is None or connections <= upper:
+            return label
+    return ROOM_SIZE_BUCKETS[-1][0]
+
+class ConnectionLimitError(Exception):
+    """Raised by ChatHub.join when the process or the user is at its connection cap"""
+
+class RoomMetrics:
+    """Delivery counters for one chat room"""
+
+    def __init__(self):
+        self.broadcasts = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected_slow = 0
+        self.send_errors = 0
+        self.rate_limited = 0
+        self.oversized = 0
+        self.send_time_total = 0.0
+        self.send_time_max = 0.0
+
+    def record_send(self, elapsed: float) -> None:
+        self.delivered += 1
+        self.send_time_total += elapsed
+        self.send_time_max = max(self.send_time_max, elapsed)
+
+class ChatConnection:
+    """
+    One WebSocket in a room, with its own bounded outbound queue.
+
+    A dedicated writer task drains the queue, so a slow or dead socket only
+    ever delays its own frames, never the rest of the room.
+    """
+
+    def __init__(self, hub: "ChatHub", websocket: WebSocket, room_id: str, user_id: str):
+        self.hub = hub
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=settings.CHAT_SEND_QUEUE_SIZE)
+        self.closed = False
+        self.inbound = TokenBucket(settings.CHAT_CONNECTION_RATE, settings.CHAT_CONNECTION_BURST)
+        self.violations = 0
+        self.last_seen = time.monotonic()
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def touch(self) -> None:
+        """Record inbound activity (any frame, including pongs)"""
+        self.last_seen = time.monotonic()
+
+    def enqueue(self, text: str) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def send_json(self, payload: Dict[str, Any]) -> bool:
+        """Queue a frame for this connection only"""
+        return self.enqueue(json.dumps(payload))
+
+    async def _write_loop(self) -> None:
+        metrics = self.hub.room_metrics(self.room_id)
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is _CLOSE:
+                    break
+                started = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send_text(item), settings.CHAT_SEND_TIMEOUT)
+                metrics.record_send(time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.send_errors += 1
+            logger.debug("Chat send failed in room %s; dropping connection", self.room_id, exc_info=True)
+        finally:
+            self.closed = True
+            self.hub._discard(self)
+
+    async def close(self, code: int = 1000) -> None:
+        """Flush queued frames, stop the writer and close the socket"""
+        if not self.closed:
+            self.closed = True
+            try:
+                self.queue.put_nowait(_CLOSE)
+            except asyncio.QueueFull:
+                self._writer.cancel()
+        try:
+            await self._writer
+        except (asyncio.CancelledError, Exception):
+            pass
+        self.hub._discard(self)
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+class ChatHub:
+    """
+    Room registry that fans each broadcast out to per-connection queues.
+
+    Broadcasts go through the broker so rooms span processes; frames the
+    broker hands back are delivered to the local members only.
+    """
+
+    def __init__(self):
+        self.rooms: Dict[str, Set[ChatConnection]] = {}
+        self.metrics: Dict[str, RoomMetrics] = {}
+        self.room_limits: Dict[str, TokenBucket] = {}
+        self.user_connections: Dict[str, int] = {}
+        self.connections = 0
+        self.rejected_connections = 0
+        self.reaped_idle = 0
+        self.broker: ChatBroker = InProcessBroker()
+        self._background: Set[asyncio.Task] = set()
+        self._reaper: Optional[asyncio.Task] = None
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def start(self, broker: ChatBroker) -> None:
+        self.broker = broker
+        await broker.start(self.deliver)
+        if self._reaper is None and settings.CHAT_HEARTBEAT_INTERVAL > 0 and settings.CHAT_IDLE_TIMEOUT > 0:
+            self._reaper = asyncio.create_task(self._reap_loop(settings.CHAT_HEARTBEAT_INTERVAL))
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        for room_id in list(self.rooms):
+            await self.close_room(room_id, code=1001)
+        await self.broker.stop()
+
+    def room_metrics(self, room_id: str) -> RoomMetrics:
+        metrics = self.metrics.get(room_id)
+        if metrics is None:
+            metrics = self.metrics[room_id] = RoomMetrics()
+        return metrics
+
+    def room_limit(self, room_id: str) -> TokenBucket:
+        """Inbound bucket shared by the local members of a room (per process)"""
+        bucket = self.room_limits.get(room_id)
+        if bucket is None:
+            bucket = self.room_limits[room_id] = TokenBucket(settings.CHAT_ROOM_RATE, settings.CHAT_ROOM_BURST)
+        return bucket
+
+    async def join(self, room_id: str, websocket: WebSocket, user_id: str) -> ChatConnection:
+        if (
+            self.connections >= settings.CHAT_MAX_CONNECTIONS
+            or self.user_connections.get(user_id, 0) >= settings.CHAT_MAX_CONNECTIONS_PER_USER
+        ):
+            self.rejected_connections += 1
+            raise ConnectionLimitError()
+        is_new_room = room_id not in self.rooms
+        connection = ChatConnection(self, websocket, room_id, user_id)
+        self.rooms.setdefault(room_id, set()).add(connection)
+        self.connections += 1
+        self.user_connections[user_id] = self.user_connections.get(user_id, 0) + 1
+        if is_new_room:
+            if not is_user_room(room_id):
+                history.open_room(room_id)
+            await self.broker.subscribe(room_id)
+        return connection
+
+    async def leave(self, connection: ChatConnection) -> None:
+        await connection.close()
+
+    def _discard(self, connection: ChatConnection) -> None:
+        members = self.rooms.get(connection.room_id)
+        if members is None or connection not in members:
+            return
+        members.discard(connection)
+        self.connections -= 1
+        remaining = self.user_connections.pop(connection.user_id, 1) - 1
+        if remaining > 0:
+            self.user_connections[connection.user_id] = remaining
+        if not members:
+            del self.rooms[connection.room_id]
+            self.metrics.pop(connection.room_id, None)
+            self.room_limits.pop(connection.room_id, None)
+            history.drop_room(connection.room_id)
+            self._spawn(self._release_room(connection.room_id))
+
+    async def _release_room(self, room_id: str) -> None:
+        # Someone may have joined again while this was scheduled
+        if room_id not in self.rooms:
+            await self.broker.unsubscribe(room_id)
+
+    def reap_idle(self) -> int:
+        """Ping every local connection and close the ones silent for longer than CHAT_IDLE_TIMEOUT"""
+        if settings.CHAT_IDLE_TIMEOUT <= 0:
+            return 0
+        deadline = time.monotonic() - settings.CHAT_IDLE_TIMEOUT
+        reaped = 0
+        for members in list(self.rooms.values()):
+            for connection in list(members):
+                if connection.last_seen >= deadline:
+                    connection.enqueue(_PING_FRAME)
+                    continue
+                # Half-open sockets never raise on receive; stop sending to them here
+                reaped += 1
+                self._discard(connection)
+                self._spawn(connection.close(code=1001))
+        self.reaped_idle += reaped
+        return reaped
+
+    async def _reap_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                reaped = self.reap_idle()
+            except Exception:
+                logger.exception("Chat reaper sweep failed")
+                continue
+            if reaped:
+                logger.info("Closed %d idle chat connections", reaped)
+
+    async def broadcast(self, room_id: str, payload: Dict[str, Any]) -> None:
+        """Serialize once and publish the frame to every member of the room"""
+        await self.broker.publish(room_id, json.dumps(payload))
+
+    async def publish_status(self, room_id: str, status: str) -> None:
+        """Push a service request status change to every process serving the room"""
+        set_room_status(room_id, status)
+        await self.broker.publish(room_id, json.dumps({"type": "status", "status": status}))
+
+    def _apply_status(self, room_id: str, text: str) -> None:
+        status = json.loads(text)["status"]
+        set_room_status(room_id, status)
+        members = list(self.rooms.get(room_id, ()))
+        for connection in members:
+            connection.enqueue(text)
+        if status == ServiceRequestStatus.accepted:
+            return
+        # El chat solo vive mientras el servicio está accepted: cerrar ya
+        for connection in members:
+            connection.send_json({"error": "CHAT_DISABLED"})
+            self._discard(connection)
+            self._spawn(connection.close())
+
+    def deliver(self, room_id: str, text: str) -> int:
+        """Queue a serialized frame for the local members of a room"""
+        if text.startswith(_STATUS_FRAME_PREFIX):
+            self._apply_status(room_id, text)
+            return 0
+        if history.has_room(room_id):
+            history.record(room_id, json.loads(text))
+        members = self.rooms.get(room_id)
+        if not members:
+            return 0
+        metrics = self.room_metrics(room_id)
+        metrics.broadcasts += 1
+        queued = 0
+        for connection in list(members):
+            if connection.enqueue(text):
+                queued += 1
+                continue
+            if connection.closed:
+                continue
+            if settings.CHAT_SLOW_CONSUMER_POLICY == "disconnect":
+                metrics.disconnected_slow += 1
+                self._discard(connection)
+                self._spawn(connection.close(code=1008))
+            else:
+                metrics.dropped += 1
+        return queued
+
+    async def close_room(self, room_id: str, code: int = 1000) -> None:
+        for connection in list(self.rooms.get(room_id, ())):
+            await connection.close(code=code)
+
+    def room_sizes(self) -> Dict[str, int]:
+        """Chat rooms per ROOM_SIZE_BUCKETS bucket of local connections (event channels excluded)"""
+        sizes = {label: 0 for label, _ in ROOM_SIZE_BUCKETS}
+        for room_id, members in list(self.rooms.items()):
+            if not is_user_room(room_id):
+                sizes[room_size_bucket(len(members))] += 1
+        return sizes
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Process-wide chat counters. Only aggregates: room ids are service
+        request ids and must not leak through unauthenticated endpoints.
+        """
+        totals = RoomMetrics()
+        depth_total = 0
+        depth_max = 0
+        user_channels = 0
+        for room_id, members in list(self.rooms.items()):
+            depths = [connection.queue.qsize() for connection in members]
+            depth_total += sum(depths)
+            depth_max = max(depth_max, max(depths, default=0))
+            if is_user_room(room_id):
+                user_channels += 1
+            metrics = self.metrics.get(room_id)
+            if metrics is None:
+                continue
+            for name in ("broadcasts", "delivered", "dropped", "disconnected_slow", "send_errors",
+                         "rate_limited", "oversized", "send_time_total"):
+                setattr(totals, name, getattr(totals, name) + getattr(metrics, name))
+            totals.send_time_max = max(totals.send_time_max, metrics.send_time_max)
+        return {
+            "pid": os.getpid(),
+            "rooms": len(self.rooms) - user_channels,
+            "user_channels": user_channels,
+            "connections": self.connections,
+            "users": len(self.user_connections),
+            "max_connections": settings.CHAT_MAX_CONNECTIONS,
+            "rejected_connections": self.rejected_connections,
+            "reaped_idle": self.reaped_idle,
+            "room_sizes": self.room_sizes(),
+            "queue_depth_total": depth_total,
+            "queue_depth_max": depth_max,
+            # Counters of the rooms currently open in this process
+            "broadcasts": totals.broadcasts,
+            "delivered": totals.delivered,
+            "dropped": totals.dropped,
+            "disconnected_slow": totals.disconnected_slow,
+            "send_errors": totals.send_errors,
+            "rate_limited": totals.rate_limited,
+            "oversized": totals.oversized,
+            "send_latency_avg_seconds": round(totals.send_time_total / totals.delivered, 6) if totals.delivered else 0.0,
+            "send_latency_max_seconds": round(totals.send_time_max, 6),
+        }
+
+chat_hub = ChatHub()
+
+_chat_connections = Gauge("chat_connections", "Open chat sockets in this process")
+_chat_rooms = Gauge("chat_rooms", "Chat rooms with local members in this process")
+_chat_user_channels = Gauge("chat_user_channels", "Users with an open event channel in this process")
+# Bucketed by size: a label per room would be unbounded and expose request ids
+_chat_rooms_by_size = Gauge("chat_rooms_by_size", "Chat rooms by open local sockets", ("size",))
+
+def _collect_chat_metrics() -> None:
+    _chat_connections.set(chat_hub.connections)
+    sizes = chat_hub.room_sizes()
+    for label, count in sizes.items():
+        _chat_rooms_by_size.set(count, label)
+    rooms = sum(sizes.values())
+    _chat_rooms.set(rooms)
+    _chat_user_channels.set(len(chat_hub.rooms) - rooms)
+
+register_collector(_collect_chat_metrics)
@@ -0,0 +1,40 @@
+import time
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second up to `burst`.
+
+    Buckets live on the event loop thread only, so no locking is needed.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount: float = 1.0) -> bool:
+        """Take `amount` tokens if available; never blocks"""
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+    def refund(self, amount: float = 1.0) -> None:
+        """Give back tokens taken for a message that was rejected further on"""
+        self.tokens = min(self.burst, self.tokens + amount)
+
+    def retry_after(self, amount: float = 1.0) -> float:
+        """Seconds until `amount` tokens are available"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
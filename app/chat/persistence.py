@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from ..core.background import BatchQueue
+from ..core.config import get_settings
+from ..repositories import service_messages as service_messages_repo
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def build_message(service_request_id: str, sender_id: str, message: str) -> Dict[str, Any]:
+    """Chat message row with a server-assigned id and timestamp, ready to broadcast and store"""
+    return {
+        "id": str(uuid.uuid4()),
+        "service_request_id": service_request_id,
+        "sender_id": sender_id,
+        "message": message,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+class MessageWriter:
+    """
+    Write-behind persistence for chat messages.
+
+    In "batched" mode messages go through a BatchQueue and are flushed in bulk
+    inserts when the batch is full or the flush window elapses; in "sync" mode
+    (or when the queue is full) each message is stored before `persist` returns.
+
+    Queued and in-flight messages stay readable through `pending` until their
+    batch is written (or dropped), so history reads never miss them.
+    """
+
+    def __init__(self):
+        self._queue: Optional[BatchQueue[Dict[str, Any]]] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._queue is None and settings.CHAT_PERSISTENCE_MODE == "batched":
+            self._queue = BatchQueue(
+                "chat messages",
+                self._flush,
+                batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+                queue_size=settings.CHAT_WRITE_QUEUE_SIZE,
+                flush_interval=settings.CHAT_WRITE_FLUSH_INTERVAL
+            )
+            self._queue.start()
+
+    async def persist(self, message: Dict[str, Any]) -> None:
+        if self._queue is None or not self._queue.offer([message]):
+            await self._write([message], raise_on_failure=True)
+            return
+        self._pending[message["id"]] = message
+
+    def pending_message(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """A message accepted by `persist` but not written yet"""
+        return self._pending.get(message_id)
+
+    def pending(self, room_id: str) -> List[Dict[str, Any]]:
+        """A room's messages not written yet, oldest first"""
+        return [message for message in self._pending.values() if message["service_request_id"] == room_id]
+
+    async def _write(self, batch: List[Dict[str, Any]], raise_on_failure: bool = False) -> None:
+        delay = settings.CHAT_WRITE_RETRY_BASE_DELAY
+        for attempt in range(settings.CHAT_WRITE_MAX_RETRIES + 1):
+            try:
+                await service_messages_repo.insert_messages(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                if attempt == settings.CHAT_WRITE_MAX_RETRIES:
+                    self.failed += len(batch)
+                    logger.exception("Dropping %d chat messages after %d attempts", len(batch), attempt + 1)
+                    if raise_on_failure:
+                        raise
+                    return
+                self.retries += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await self._write(batch)
+        finally:
+            for message in batch:
+                self._pending.pop(message["id"], None)
+
+    async def drain(self) -> None:
+        """Flush everything still queued and stop the flush task (app shutdown)"""
+        if self._queue is not None:
+            await self._queue.drain()
+            self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.CHAT_PERSISTENCE_MODE,
+            "pending": self._queue.pending() if self._queue is not None else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
+
+message_writer = MessageWriter()
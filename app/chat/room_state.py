@@ -0,0 +1,28 @@
+from typing import Optional
+
+from ..core.cache import TTLCache
+from ..core.config import get_settings
+from ..repositories import service_requests as service_requests_repo
+
+settings = get_settings()
+
+# Service request status per chat room. Transitions are pushed by the services
+# router, the TTL only bounds staleness for changes made outside the API.
+room_status_cache: TTLCache = TTLCache(
+    "chat_room_status",
+    settings.CHAT_ROOM_STATUS_CACHE_SIZE,
+    settings.CHAT_ROOM_STATUS_TTL
+)
+
+def set_room_status(room_id: str, status: str) -> None:
+    room_status_cache.set(room_id, status)
+
+async def get_room_status(room_id: str) -> Optional[str]:
+    status = room_status_cache.get(room_id)
+    if status is not None:
+        return status
+    req = await service_requests_repo.get_service_request(room_id, columns="id,status")
+    if not req:
+        return None
+    set_room_status(room_id, req["status"])
+    return req["status"]
@@ -1,33 +1,61 @@
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from .config import get_settings
+from .cache import token_cache
+from .metrics import stage_duration_seconds
+from .tokens import InvalidTokenError, token_service
 from ..models.user import UserRole
+from ..repositories import refresh_tokens as refresh_tokens_repo
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    return token_service.create_access_token(data, expires_delta)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def create_refresh_token(user_id: str, role: str) -> str:
+    return token_service.create_refresh_token(user_id, role)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+async def use_refresh_token(token: str) -> Optional[dict]:
+    """
+    Validate a refresh token and consume it (rotation); None if invalid or already used.
 
-def verify_token(token: str) -> Optional[dict]:
+    Use is recorded in the database, so a replay is rejected on every process
+    and after restarts; the local revocation only saves that round-trip when
+    the replay hits the same process.
+    """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
-        return None 
\ No newline at end of file
+        payload = token_service.decode_refresh(token)
+    except InvalidTokenError:
+        return None
+    if not await refresh_tokens_repo.consume_refresh_token(
+        token_service.token_id(token, payload), payload["sub"], payload["exp"]
+    ):
+        return None
+    token_service.revoke(token, payload)
+    return payload
+
+def verify_token(token: str) -> Optional[dict]:
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            with stage_duration_seconds.time("jwt_decode"):
+                payload = token_service.decode(token)
+        except InvalidTokenError:
+            return None
+        # Never keep a decoded token around past its own expiry
+        exp = payload.get("exp")
+        token_cache.set(token, payload, ttl=exp - time.time() if exp else None)
+    # Checked on cache hits too, so a revocation takes effect immediately
+    if token_service.is_revoked(token, payload):
+        return None
+    return payload
+
+def revoke_token(token: str) -> bool:
+    """Revoke a valid token in this process until it expires; False if it was not valid"""
+    payload = verify_token(token)
+    if payload is None:
+        return False
+    token_service.revoke(token, payload)
+    token_cache.invalidate(token)
+    return True 
\ No newline at end of file
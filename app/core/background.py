@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+class BatchQueue(Generic[T]):
+    """
+    Bounded queue drained by one background task that hands items to
+    `flush` in batches, in the order they were queued.
+
+    A batch closes at `batch_size` items or `flush_interval` seconds after its
+    first item (0: only what is already queued). `offer` never waits: before
+    `start`, after `drain` or when the queue is full it returns False and the
+    caller writes inline, which slows the producer down instead of growing
+    memory without bound.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[T]], Awaitable[None]],
+        batch_size: int,
+        queue_size: int,
+        flush_interval: float = 0.0
+    ):
+        self.name = name
+        self._flush = flush
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._flush_interval = flush_interval
+        self._queue: Optional["asyncio.Queue[object]"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    def offer(self, items: Sequence[T]) -> bool:
+        """Queue all of `items` or none of them; False when the caller must write them itself"""
+        if self._task is None or self._queue.maxsize - self._queue.qsize() < len(items):
+            return False
+        for item in items:
+            self._queue.put_nowait(item)
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception:
+                # `flush` handles its own retries; never let one batch stop the queue
+                logger.exception("%s: dropping a batch of %d", self.name, len(batch))
+
+    async def drain(self) -> None:
+        """Flush everything still queued and stop the task (app shutdown)"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+class PeriodicTask:
+    """
+    Background task that awaits `func` every `interval` seconds until `stop`.
+
+    A failing run is logged with `error_message` and retried on the next tick;
+    an interval of 0 (or less) disables the task.
+    """
+
+    def __init__(self, func: Callable[[], Awaitable[Any]], interval: float, error_message: str):
+        self._func = func
+        self._interval = interval
+        self._error_message = error_message
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self._func()
+            except Exception:
+                logger.exception(self._error_message)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
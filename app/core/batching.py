@@ -0,0 +1,17 @@
+import asyncio
+from typing import Any, Awaitable, Dict
+
+async def gather_lookups(**lookups: Awaitable[Any]) -> Dict[str, Any]:
+    """
+    Await independent lookups concurrently and return their results by name.
+
+    The caller waits for the slowest lookup instead of the sum of all of them.
+    Every lookup is awaited even when one fails, so no query is left running
+    on a pooled client behind the request, and the first error is re-raised.
+    """
+    names = list(lookups)
+    results = await asyncio.gather(*lookups.values(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(names, results))
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from .config import get_settings
+from .metrics import Gauge, SnapshotCounter, register_collector
+
+settings = get_settings()
+
+V = TypeVar("V")
+
+class TTLCache(Generic[V]):
+    """
+    Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    Keeps hit/miss/eviction counters so cache effectiveness can be monitored.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl` can only shorten the cache-wide TTL for this entry"""
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+_registry: Dict[str, TTLCache] = {}
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+_cache_size = Gauge("cache_entries", "Entries held by an in-process cache", ("cache",))
+_cache_hits = SnapshotCounter("cache_hits_total", "In-process cache hits", ("cache",))
+_cache_misses = SnapshotCounter("cache_misses_total", "In-process cache misses", ("cache",))
+
+def _collect_cache_metrics() -> None:
+    for name, stats in get_cache_stats().items():
+        _cache_size.set(stats["size"], name)
+        _cache_hits.set(stats["hits"], name)
+        _cache_misses.set(stats["misses"], name)
+
+register_collector(_collect_cache_metrics)
+
+# Profiles returned by get_current_user, keyed by user id
+user_cache: TTLCache = TTLCache("users", settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+# Decoded JWT payloads, keyed by the raw token
+token_cache: TTLCache = TTLCache("tokens", settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+# Service request counts per status, keyed by (role, user id). Invalidated on
+# create/status change through the API; the TTL bounds anything done elsewhere.
+request_counts_cache: TTLCache = TTLCache(
+    "request_counts",
+    settings.REQUEST_COUNTS_CACHE_SIZE,
+    settings.REQUEST_COUNTS_TTL
+)
@@ -0,0 +1,43 @@
+import hashlib
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Request, Response
+
+# Authenticated payloads: revalidate every time, never store in shared caches
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; weak comparison, so W/ prefixes on either side are ignored"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in candidates)
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Weak ETag of `parts`: a version (index generation, updated_at...) plus the
+    query, or the raw rows themselves. Hashing them with orjson is far cheaper
+    than validating and dumping the response they would produce.
+    """
+    raw = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return 'W/"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+def conditional_response(
+    request: Request,
+    etag: str,
+    render: Callable[[], Response],
+    cache_control: str = PRIVATE_CACHE_CONTROL
+) -> Response:
+    """
+    304 when the client already holds `etag`, otherwise `render()` with the
+    ETag attached. `render` only runs on a miss, so a revalidation skips
+    building and serializing the payload.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response = render()
+    response.headers.update(headers)
+    return response
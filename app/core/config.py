@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     SUPABASE_URL: str
@@ -7,7 +8,96 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     SECRET_KEY: str
+    VERSION: str = "1.0.0"
+    ENVIRONMENT: str = "development"
+
+    # Supabase client pools
+    SUPABASE_POOL_SIZE: int = 10
+    SUPABASE_ADMIN_POOL_SIZE: int = 4
+    SUPABASE_POOL_TIMEOUT: float = 10.0
+    # Run blocking Supabase calls in a bounded thread pool instead of on the event loop
+    SUPABASE_OFFLOAD: bool = True
+
+    # In-process caches for get_current_user
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: float = 300.0
+
+    # Per-user service request counts by status (inbox badges)
+    REQUEST_COUNTS_CACHE_SIZE: int = 10000
+    REQUEST_COUNTS_TTL: float = 30.0
+
+    # Locations/categories snapshot refresh interval
+    REFERENCE_DATA_REFRESH_SECONDS: float = 300.0
+
+    # Full rebuild interval of the in-memory worker search index
+    WORKER_INDEX_REFRESH_SECONDS: float = 120.0
+    WORKER_INDEX_PAGE_SIZE: int = 1000  # rows per load query; keep at or below PostgREST max-rows
+
+    # Bulk recompute of worker rating aggregates (0 disables)
+    RATING_RECONCILE_INTERVAL_SECONDS: float = 21600.0
+
+    # JWT verification: "jose" (python-jose) or "fast" (stdlib HS256, same semantics)
+    JWT_BACKEND: str = "jose"
+    TOKEN_REVOCATION_SIZE: int = 100000  # revoked tokens remembered per process until they expire
+
+    # Local bcrypt hashing (dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 2
+    BCRYPT_MAX_PENDING: int = 32  # hash/verify calls running or queued before rejecting
+    BCRYPT_QUEUE_TIMEOUT: float = 5.0
+
+    # Per-request Supabase call profiling (Server-Timing header + budget warnings)
+    DB_PROFILING: bool = False
+    DB_CALL_BUDGET: int = 5
+    DB_TIME_BUDGET_MS: float = 500.0
+    DB_CALL_BUDGETS: Dict[str, int] = {}  # per route template, e.g. {"/api/v1/auth/register/worker": 6}
+
+    # Chat fan-out
+    CHAT_SEND_QUEUE_SIZE: int = 100
+    CHAT_SEND_TIMEOUT: float = 10.0
+    CHAT_SLOW_CONSUMER_POLICY: str = "disconnect"  # "disconnect" or "drop"
+    CHAT_BROKER: str = "memory"  # "memory" (single process) or "redis"
+    CHAT_REDIS_URL: Optional[str] = None
+    CHAT_ROOM_STATUS_CACHE_SIZE: int = 10000
+    CHAT_ROOM_STATUS_TTL: float = 300.0
+    CHAT_EVENTS_REPLAY_LIMIT: int = 100  # events per replay frame on /ws/events
+    USER_EVENTS_QUEUE_SIZE: int = 10000  # events waiting for the background publisher
+    USER_EVENTS_BATCH_SIZE: int = 500  # events stored per insert
+    USER_EVENTS_RETENTION_DAYS: int = 7  # replayable window; older events are pruned
+    USER_EVENTS_PRUNE_INTERVAL_SECONDS: float = 3600.0  # 0 disables
+
+    # Chat message persistence
+    CHAT_PERSISTENCE_MODE: str = "batched"  # "batched" (write-behind) or "sync"
+    CHAT_WRITE_BATCH_SIZE: int = 100
+    CHAT_WRITE_FLUSH_INTERVAL: float = 0.2
+    CHAT_WRITE_QUEUE_SIZE: int = 10000
+    CHAT_WRITE_MAX_RETRIES: int = 5
+    CHAT_WRITE_RETRY_BASE_DELAY: float = 0.5
+
+    # Chat history paging
+    CHAT_HISTORY_PAGE_SIZE: int = 50
+    CHAT_HISTORY_MAX_PAGE_SIZE: int = 200
+    CHAT_HISTORY_BUFFER_SIZE: int = 200
+
+    # Chat inbound limits (token buckets; a rate of 0 disables the limit)
+    CHAT_MAX_MESSAGE_BYTES: int = 4096
+    CHAT_CONNECTION_RATE: float = 5.0  # frames per second per connection
+    CHAT_CONNECTION_BURST: int = 10
+    CHAT_ROOM_RATE: float = 20.0  # chat messages per second per room
+    CHAT_ROOM_BURST: int = 40
+    CHAT_MAX_VIOLATIONS: int = 20  # consecutive rejected frames before closing (1008)
+
+    # Chat connection management
+    # Half-open sockets are caught by uvicorn's protocol pings (--ws-ping-interval/--ws-ping-timeout);
+    # the app-level {"type": "ping"} reaper is opt-in until every client answers it
+    CHAT_HEARTBEAT_INTERVAL: float = 25.0  # seconds between app pings and reaper sweeps
+    CHAT_IDLE_TIMEOUT: float = 0.0  # close sockets silent (no frames, no pongs) for this long; 0 disables
+    CHAT_MAX_CONNECTIONS: int = 10000  # per process
+    CHAT_MAX_CONNECTIONS_PER_USER: int = 5
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,43 @@
+import base64
+import json
+import re
+import uuid
+from typing import Any, Dict, List
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor or does not fit the listing"""
+
+# ISO timestamps as PostgREST returns them; anything else could alter the keyset filter
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:?\d{2}|Z)?$")
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Values of an opaque cursor holding exactly `size` of them"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+def encode_keyset_cursor(row: Dict[str, Any]) -> str:
+    """Cursor after `row` in a (created_at desc, id desc) listing"""
+    return encode_cursor(row["created_at"], row["id"])
+
+def decode_keyset_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    The `{"created_at", "id"}` row a keyset cursor points at. Both values are
+    checked since they end up inside a PostgREST filter string.
+    """
+    created_at, row_id = decode_cursor(cursor, 2)
+    if not isinstance(created_at, str) or not _TIMESTAMP.match(created_at) or not isinstance(row_id, str):
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        uuid.UUID(row_id)
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+    return {"created_at": created_at, "id": row_id}
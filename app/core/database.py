@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from supabase import Client
+from .config import get_settings
+from .supabase import get_anon_pool, get_admin_pool
+from .metrics import db_query_duration_seconds, db_query_errors_total
+from .profiling import record_db_call
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def init_executor() -> None:
+    """
+    Create the bounded thread pool used to run blocking Supabase calls.
+
+    It is sized to the client pools so a worker thread never waits for a client.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SUPABASE_POOL_SIZE + settings.SUPABASE_ADMIN_POOL_SIZE,
+                thread_name_prefix="supabase"
+            )
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    if _executor is None:
+        init_executor()
+    return _executor
+
+async def run_blocking(func: Callable[..., T], *args) -> T:
+    """Run a blocking callable off the event loop (inline when offloading is disabled)"""
+    if not settings.SUPABASE_OFFLOAD:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args))
+
+def _with_pooled_client(operation: Callable[[Client], T], admin: bool, table: str, op: str) -> T:
+    pool = get_admin_pool() if admin else get_anon_pool()
+    with pool.connection() as client:
+        # Timed after the lease: pool waits are reported by the pool stats
+        started = time.perf_counter()
+        try:
+            return operation(client)
+        except Exception:
+            db_query_errors_total.inc(table, op)
+            raise
+        finally:
+            db_query_duration_seconds.observe(time.perf_counter() - started, table, op)
+
+async def run_query(
+    operation: Callable[[Client], T],
+    admin: bool = False,
+    table: str = "unknown",
+    op: str = "unknown"
+) -> T:
+    """
+    Run `operation` with a pooled client without blocking the event loop.
+
+    `operation` receives the leased client and must finish (call `.execute()`)
+    before returning, since the client goes back to the pool right after.
+    `table` and `op` label its latency and error metrics.
+    """
+    started = time.perf_counter()
+    try:
+        return await run_blocking(_with_pooled_client, operation, admin, table, op)
+    finally:
+        # Wall time as the request sees it, pool and executor waits included
+        record_db_call(table, op, time.perf_counter() - started)
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from .config import get_settings
+
+settings = get_settings()
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when too many hash/verify calls are already waiting for the bcrypt pool"""
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Optional[asyncio.Semaphore] = None
+
+def init_password_hasher() -> None:
+    """
+    Create the dedicated bcrypt thread pool (done on first use otherwise).
+
+    bcrypt releases the GIL while hashing, so a few threads keep its CPU time
+    off the event loop without competing with the Supabase executor. No route
+    hashes locally today (Supabase auth checks passwords), so the app does not
+    start it; any local hashing should go through the async helpers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+def shutdown_password_hasher() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    if _executor is None:
+        init_password_hasher()
+    return _executor
+
+def _get_pending() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running loop
+    global _pending
+    if _pending is None:
+        _pending = asyncio.Semaphore(settings.BCRYPT_MAX_PENDING)
+    return _pending
+
+async def _run(func, *args):
+    pending = _get_pending()
+    try:
+        await asyncio.wait_for(pending.acquire(), settings.BCRYPT_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordHasherBusy("Password hashing is saturated; try again later")
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        pending.release()
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool; raises PasswordHasherBusy under a login storm"""
+    return await _run(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool; raises PasswordHasherBusy under load"""
+    return await _run(get_password_hash, password)
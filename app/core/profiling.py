@@ -0,0 +1,74 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class RequestProfile:
+    """
+    Supabase calls made while serving one request.
+
+    Shared by reference through a ContextVar, so calls made from tasks the
+    request spawns (e.g. asyncio.gather) are recorded in the same profile.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls: List[Tuple[str, str, float]] = []
+
+    def record(self, table: str, op: str, elapsed: float) -> None:
+        self.calls.append((table, op, elapsed))
+
+    @property
+    def db_calls(self) -> int:
+        return len(self.calls)
+
+    @property
+    def db_time(self) -> float:
+        return sum(elapsed for _, _, elapsed in self.calls)
+
+    def by_query(self) -> Dict[str, Tuple[int, float]]:
+        """Call count and total time per `table.op`"""
+        grouped: Dict[str, Tuple[int, float]] = {}
+        for table, op, elapsed in self.calls:
+            count, total = grouped.get(f"{table}.{op}", (0, 0.0))
+            grouped[f"{table}.{op}"] = (count + 1, total + elapsed)
+        return grouped
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value: totals first, then one entry per table/operation"""
+        entries = [
+            f'app;dur={(time.perf_counter() - self.started) * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_calls} calls"',
+        ]
+        for name, (count, total) in self.by_query().items():
+            token = re.sub(r"[^A-Za-z0-9_-]", "-", name)
+            entries.append(f'db-{token};dur={total * 1000:.1f};desc="{count}x {name}"')
+        return ", ".join(entries)
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+def start_profile() -> Tuple[RequestProfile, Any]:
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+def end_profile(token: Any) -> None:
+    _current_profile.reset(token)
+
+def record_db_call(table: str, op: str, elapsed: float) -> None:
+    """Add a Supabase call to the current request's profile, if one is being collected"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(table, op, elapsed)
+
+@contextmanager
+def count_db_calls() -> Iterator[RequestProfile]:
+    """
+    Collect the Supabase calls made inside the block, e.g. around a direct
+    `await endpoint(...)` in a test, regardless of DB_PROFILING.
+    """
+    profile, token = start_profile()
+    try:
+        yield profile
+    finally:
+        end_profile(token)
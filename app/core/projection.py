@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+class InvalidFieldsError(ValueError):
+    """Raised for a `fields=` value naming columns that cannot be selected"""
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Sequence[str]) -> Sequence[str]:
+    """
+    Validate a comma separated `fields=` value against `allowed`.
+
+    Without `fields` the listing's `default` projection is used; the id is
+    always returned so items stay addressable.
+    """
+    if not fields:
+        return default
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [field for field in dict.fromkeys(selected) if field != "id"]
+
+def select_columns(fields: Sequence[str]) -> str:
+    """PostgREST select string for a projection"""
+    return ",".join(fields)
+
+@lru_cache(maxsize=None)
+def _field_adapters(model: Type[BaseModel]) -> Dict[str, TypeAdapter]:
+    # Bare annotations: values are converted, not re-checked against Field constraints
+    return {name: TypeAdapter(field.annotation) for name, field in model.model_fields.items()}
+
+def typed_rows(model: Type[BaseModel], rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Projected rows with each column converted to its type on `model`, so a
+    `fields=` response serializes values (e.g. UTC timestamps as `Z`) exactly
+    like the default, model-typed projection.
+    """
+    adapters = _field_adapters(model)
+    return [
+        {name: adapters[name].validate_python(value) if name in adapters and value is not None else value
+         for name, value in row.items()}
+        for row in rows
+    ]
@@ -0,0 +1,28 @@
+import logging
+
+from .background import PeriodicTask
+from .config import get_settings
+from ..repositories import service_ratings as service_ratings_repo
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+async def reconcile_rating_aggregates() -> int:
+    """Repair drifted worker rating aggregates and return how many were fixed"""
+    drifted = await service_ratings_repo.reconcile_aggregates()
+    if drifted:
+        logger.warning("Reconciled rating aggregates for %d workers", len(drifted))
+    return len(drifted)
+
+_reconcile = PeriodicTask(
+    reconcile_rating_aggregates,
+    settings.RATING_RECONCILE_INTERVAL_SECONDS,
+    "Rating aggregate reconciliation failed"
+)
+
+def start_rating_reconciliation() -> None:
+    """Schedule the periodic drift repair (disabled when the interval is 0)"""
+    _reconcile.start()
+
+async def stop_rating_reconciliation() -> None:
+    await _reconcile.stop()
@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from .background import PeriodicTask
+from .config import get_settings
+from ..models.category import CategoryInDB
+from ..models.location import LocationInDB
+from ..repositories import categories as categories_repo, locations as locations_repo
+from ..schemas.response import APIResponse
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class ReferenceSnapshot:
+    """Immutable view of a reference table plus its pre-serialized list response"""
+
+    def __init__(self, rows: List[Dict[str, Any]], model):
+        items = [model(**row) for row in rows]
+        self.ids: FrozenSet[str] = frozenset(item.id for item in items)
+        self.body: bytes = APIResponse(success=True, data=items).model_dump_json().encode()
+        self.etag: str = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.loaded_at: float = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+_snapshots: Dict[str, ReferenceSnapshot] = {}
+_refresh_lock: Optional[asyncio.Lock] = None
+
+async def refresh_reference_data(force: bool = True) -> None:
+    """Reload locations and categories and swap in new snapshots"""
+    global _refresh_lock
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    async with _refresh_lock:
+        # Concurrent lazy loads wait for the first one instead of repeating it
+        if not force and "locations" in _snapshots and "categories" in _snapshots:
+            return
+        locations, categories = await asyncio.gather(
+            locations_repo.list_locations(),
+            categories_repo.list_categories()
+        )
+        _snapshots["locations"] = ReferenceSnapshot(locations, LocationInDB)
+        _snapshots["categories"] = ReferenceSnapshot(categories, CategoryInDB)
+
+async def _get_snapshot(name: str) -> ReferenceSnapshot:
+    if name not in _snapshots:
+        await refresh_reference_data(force=False)
+    return _snapshots[name]
+
+async def get_locations_snapshot() -> ReferenceSnapshot:
+    return await _get_snapshot("locations")
+
+async def get_categories_snapshot() -> ReferenceSnapshot:
+    return await _get_snapshot("categories")
+
+async def location_exists(location_id: str) -> bool:
+    return location_id in (await get_locations_snapshot()).ids
+
+async def category_exists(category_id: str) -> bool:
+    return category_id in (await get_categories_snapshot()).ids
+
+_refresh = PeriodicTask(
+    refresh_reference_data,
+    settings.REFERENCE_DATA_REFRESH_SECONDS,
+    "Reference data refresh failed; keeping previous snapshot"
+)
+
+async def start_reference_data() -> None:
+    """Load the snapshots at startup and keep them fresh in the background"""
+    try:
+        await refresh_reference_data()
+    except Exception:
+        # Endpoints load lazily on first use if the initial load fails
+        logger.exception("Initial reference data load failed")
+    _refresh.start()
+
+async def stop_reference_data() -> None:
+    await _refresh.stop()
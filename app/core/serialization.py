@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from ..schemas.pagination import CursorPage
+from ..schemas.response import APIResponse
+
+JSON_MEDIA_TYPE = "application/json"
+
+@lru_cache(maxsize=None)
+def page_response_adapter(item_type: Any) -> TypeAdapter:
+    """Adapter for APIResponse[CursorPage[item_type]], built (and its core schema compiled) once per item type"""
+    return TypeAdapter(APIResponse[CursorPage[item_type]])
+
+def model_response(payload: BaseModel, status_code: int = 200) -> Response:
+    """
+    Serialize an already typed response straight to JSON bytes.
+
+    Returning a Response makes FastAPI skip its response_model pass (dump,
+    re-validate, dump again); the route's response_model still documents it.
+    """
+    return Response(content=payload.model_dump_json(), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+def page_response(
+    item_type: Any,
+    items: List[Dict[str, Any]],
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None
+) -> Response:
+    """
+    APIResponse[CursorPage[item_type]] from DB rows or index entries: validated
+    in one call by the cached adapter instead of a model constructor per row,
+    then dumped by pydantic-core.
+    """
+    adapter = page_response_adapter(item_type)
+    payload = adapter.validate_python({
+        "success": True,
+        "data": {"items": items, "next_cursor": next_cursor, "total": total}
+    })
+    return Response(content=adapter.dump_json(payload), media_type=JSON_MEDIA_TYPE)
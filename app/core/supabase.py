@@ -1,10 +1,185 @@
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Dict, Iterator, Optional
+
 from supabase import create_client, Client
 from .config import get_settings
+from .metrics import Gauge, SnapshotCounter, register_collector
 
 settings = get_settings()
 
-def get_supabase_client() -> Client:
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled client becomes available within the pool timeout"""
+
+class SupabaseClientPool:
+    """
+    Fixed-size pool of reusable Supabase clients.
+
+    Clients are built lazily up to `size` and handed out exclusively, so the
+    underlying HTTP sessions (and their keep-alive connections) are reused
+    across requests instead of being rebuilt on every call.
+    """
+
+    def __init__(self, name: str, url: str, key: str, size: int, timeout: float):
+        self.name = name
+        self._url = url
+        self._key = key
+        self._size = max(1, size)
+        self._timeout = timeout
+        self._idle: "LifoQueue[Client]" = LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _try_create(self) -> Optional[Client]:
+        with self._lock:
+            if self._created >= self._size:
+                return None
+            self._created += 1
+        try:
+            return create_client(self._url, self._key)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def acquire(self) -> Client:
+        started = time.perf_counter()
+        try:
+            client = self._idle.get_nowait()
+        except Empty:
+            client = self._try_create()
+            if client is None:
+                try:
+                    client = self._idle.get(timeout=self._timeout)
+                except Empty:
+                    raise PoolTimeoutError(
+                        f"No {self.name} Supabase client available after {self._timeout}s"
+                    )
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            if waited > 0.001:
+                self._waits += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+        return client
+
+    def release(self, client: Client) -> None:
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(client)
+
+    @contextmanager
+    def connection(self) -> Iterator[Client]:
+        client = self.acquire()
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "size": self._size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquired_total": self._acquired,
+                "waits_total": self._waits,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+                "wait_time_max_seconds": round(self._wait_time_max, 6),
+            }
+
+    def close(self) -> None:
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except Empty:
+                break
+            session = getattr(getattr(client, "postgrest", None), "session", None)
+            if session is not None:
+                session.close()
+            with self._lock:
+                self._created -= 1
+
+_anon_pool: Optional[SupabaseClientPool] = None
+_admin_pool: Optional[SupabaseClientPool] = None
+_pools_lock = threading.Lock()
+
+def init_pools() -> None:
+    """Create the process-wide anon and service-role pools (called from the app lifespan)"""
+    global _anon_pool, _admin_pool
+    with _pools_lock:
+        if _anon_pool is None:
+            _anon_pool = SupabaseClientPool(
+                "anon",
+                settings.SUPABASE_URL,
+                settings.SUPABASE_KEY,
+                settings.SUPABASE_POOL_SIZE,
+                settings.SUPABASE_POOL_TIMEOUT,
+            )
+        if _admin_pool is None:
+            _admin_pool = SupabaseClientPool(
+                "admin",
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY,
+                settings.SUPABASE_ADMIN_POOL_SIZE,
+                settings.SUPABASE_POOL_TIMEOUT,
+            )
+
+def close_pools() -> None:
+    global _anon_pool, _admin_pool
+    with _pools_lock:
+        for pool in (_anon_pool, _admin_pool):
+            if pool is not None:
+                pool.close()
+        _anon_pool = None
+        _admin_pool = None
+
+def get_anon_pool() -> SupabaseClientPool:
+    if _anon_pool is None:
+        init_pools()
+    return _anon_pool
+
+def get_admin_pool() -> SupabaseClientPool:
+    if _admin_pool is None:
+        init_pools()
+    return _admin_pool
+
+def get_pool_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        pool.name: pool.stats()
+        for pool in (_anon_pool, _admin_pool)
+        if pool is not None
+    }
+
+def create_auth_client() -> Client:
+    """
+    Build a throwaway anon client for password sign-in.
+
+    `sign_in_with_password` stores the user's session on the client it runs on,
+    so it must never run on a pooled client shared with other requests.
+    """
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
-def get_supabase_admin_client() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY) 
\ No newline at end of file
+_pool_in_use = Gauge("supabase_pool_in_use", "Supabase clients currently leased", ("pool",))
+_pool_idle = Gauge("supabase_pool_idle", "Supabase clients idle in the pool", ("pool",))
+_pool_waits = SnapshotCounter("supabase_pool_waits_total", "Leases that had to wait for a free client", ("pool",))
+_pool_wait_seconds = SnapshotCounter("supabase_pool_wait_seconds_total", "Time spent waiting for a free client", ("pool",))
+
+def _collect_pool_metrics() -> None:
+    for name, stats in get_pool_stats().items():
+        _pool_in_use.set(stats["in_use"], name)
+        _pool_idle.set(stats["idle"], name)
+        _pool_waits.set(stats["waits_total"], name)
+        _pool_wait_seconds.set(stats["wait_time_total_seconds"], name)
+
+register_collector(_collect_pool_metrics)
@@ -0,0 +1,183 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from calendar import timegm
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwk, jwt
+
+from .cache import TTLCache
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class InvalidTokenError(Exception):
+    """Raised for a token that is malformed, badly signed, expired or fails a claim check"""
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def _timestamp(value: Any) -> Any:
+    return timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+
+class _JoseBackend:
+    """python-jose with the key object built once instead of on every call"""
+
+    def __init__(self, secret: str, algorithm: str):
+        self.algorithm = algorithm
+        self._key = jwk.construct(secret, algorithm)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return jwt.decode(token, self._key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+
+class _HS256Backend:
+    """
+    Stdlib HS256 encoder/decoder with the same checks python-jose applies to
+    `jwt.decode(token, key, algorithms=["HS256"])`: signature, exp, nbf, and
+    the iat/sub/jti types; an `aud` claim is rejected since no audience is
+    expected. The tokens it produces are byte-identical to python-jose's.
+    """
+
+    algorithm = "HS256"
+    _header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":"), sort_keys=True).encode())
+
+    def __init__(self, secret: str):
+        self._key = secret.encode()
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, hashlib.sha256).digest()
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        claims = {name: _timestamp(value) if name in ("exp", "iat", "nbf") else value for name, value in claims.items()}
+        signing_input = f"{self._header}.{_b64encode(json.dumps(claims, separators=(',', ':')).encode())}"
+        return f"{signing_input}.{_b64encode(self._sign(signing_input.encode()))}"
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+            header = json.loads(_b64decode(header_segment.decode()))
+            payload = json.loads(_b64decode(payload_segment.decode()))
+            signature = _b64decode(signature.decode())
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise InvalidTokenError("Malformed token")
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise InvalidTokenError("The specified alg value is not allowed")
+        if not hmac.compare_digest(signature, self._sign(signing_input)):
+            raise InvalidTokenError("Signature verification failed.")
+        if not isinstance(payload, dict):
+            raise InvalidTokenError("Invalid payload string: must be a json object")
+        self._validate_claims(payload)
+        return payload
+
+    @staticmethod
+    def _validate_claims(claims: Dict[str, Any]) -> None:
+        now = timegm(datetime.utcnow().utctimetuple())
+        try:
+            if "iat" in claims:
+                int(claims["iat"])
+            if "nbf" in claims and int(claims["nbf"]) > now:
+                raise InvalidTokenError("The token is not yet valid (nbf)")
+            if "exp" in claims and int(claims["exp"]) < now:
+                raise InvalidTokenError("Signature has expired.")
+        except (TypeError, ValueError):
+            raise InvalidTokenError("Invalid time claim")
+        if "aud" in claims:
+            raise InvalidTokenError("Invalid audience")
+        for name in ("sub", "jti"):
+            if name in claims and not isinstance(claims[name], str):
+                raise InvalidTokenError(f"Invalid {name} claim")
+
+REFRESH_TOKEN_TYPE = "refresh"
+
+class TokenService:
+    """
+    Issues and verifies access and refresh tokens with keys built once per process.
+
+    Refresh tokens carry `type: refresh` and are only accepted by
+    `decode_refresh`. Revocations are kept locally (per process) until the
+    token would have expired anyway, keyed by the `jti` every issued token carries;
+    refresh token rotation is also recorded in the database (see
+    `core.auth.use_refresh_token`).
+    """
+
+    def __init__(self, secret: str, algorithm: str, backend: str = "jose"):
+        self.algorithm = algorithm
+        self.access_token_lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        self.refresh_token_lifetime = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        if backend == "fast" and algorithm == "HS256":
+            self._backend = _HS256Backend(secret)
+        else:
+            if backend == "fast":
+                logger.warning("JWT_BACKEND=fast only supports HS256; using python-jose for %s", algorithm)
+            self._backend = _JoseBackend(secret, algorithm)
+        self.backend = "fast" if isinstance(self._backend, _HS256Backend) else "jose"
+        self._revoked: TTLCache = TTLCache(
+            "revoked_tokens",
+            settings.TOKEN_REVOCATION_SIZE,
+            max(self.access_token_lifetime, self.refresh_token_lifetime).total_seconds()
+        )
+
+    def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+        claims = dict(data)
+        claims["exp"] = datetime.utcnow() + (expires_delta or self.access_token_lifetime)
+        claims.setdefault("jti", uuid.uuid4().hex)
+        return self._backend.encode(claims)
+
+    def create_refresh_token(self, user_id: str, role: str) -> str:
+        return self._backend.encode({
+            "sub": user_id,
+            "role": role,
+            "type": REFRESH_TOKEN_TYPE,
+            "exp": datetime.utcnow() + self.refresh_token_lifetime,
+            "jti": uuid.uuid4().hex
+        })
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verified claims of an access token; raises InvalidTokenError"""
+        payload = self._backend.decode(token)
+        if payload.get("type") == REFRESH_TOKEN_TYPE:
+            raise InvalidTokenError("Refresh tokens cannot be used for authentication")
+        return payload
+
+    def decode_refresh(self, token: str) -> Dict[str, Any]:
+        """Verified, unrevoked claims of a refresh token; raises InvalidTokenError"""
+        payload = self._backend.decode(token)
+        if payload.get("type") != REFRESH_TOKEN_TYPE:
+            raise InvalidTokenError("Not a refresh token")
+        if self.is_revoked(token, payload):
+            raise InvalidTokenError("Refresh token has been revoked")
+        return payload
+
+    @staticmethod
+    def token_id(token: str, payload: Dict[str, Any]) -> str:
+        """The token's `jti`, or a hash of the token for ones issued without it"""
+        jti = payload.get("jti")
+        return jti if jti else hashlib.sha256(token.encode()).hexdigest()
+
+    def revoke(self, token: str, payload: Dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp else None
+        if ttl is not None and ttl <= 0:
+            return
+        self._revoked.set(self.token_id(token, payload), True, ttl=ttl)
+
+    def is_revoked(self, token: str, payload: Dict[str, Any]) -> bool:
+        return self._revoked.get(self.token_id(token, payload)) is not None
+
+token_service = TokenService(settings.SECRET_KEY, settings.ALGORITHM, settings.JWT_BACKEND)
@@ -0,0 +1,229 @@
+import bisect
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .background import PeriodicTask
+from .config import get_settings
+from .cursors import InvalidCursorError, decode_cursor, encode_cursor
+from .projection import InvalidFieldsError, parse_fields as parse_projection
+from ..models.user import WorkerSummary
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Columns kept per worker; also the columns selected when (re)loading the index
+WORKER_INDEX_FIELDS: Tuple[str, ...] = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "dni",
+    "phone_number",
+    "role",
+    "location_id",
+    "category_id",
+    "address",
+    "is_active",
+    "is_verified",
+    "average_rating",
+    "ratings_count",
+)
+# Default projection of listings; the other index fields are opt-in via `fields=`
+WORKER_SUMMARY_FIELDS: Tuple[str, ...] = tuple(WorkerSummary.model_fields)
+SORT_FIELDS: Tuple[str, ...] = ("average_rating", "ratings_count")
+SORT_ORDERS: Tuple[str, ...] = ("asc", "desc")
+
+class InvalidSearchError(ValueError):
+    """Raised for unknown sort/fields values or a malformed cursor"""
+
+def _project(row: Dict[str, Any]) -> Dict[str, Any]:
+    worker = {field: row.get(field) for field in WORKER_INDEX_FIELDS}
+    worker["average_rating"] = worker["average_rating"] or 0
+    worker["ratings_count"] = worker["ratings_count"] or 0
+    return worker
+
+def _is_searchable(row: Dict[str, Any]) -> bool:
+    return row.get("role") == "worker" and row.get("is_verified") is True
+
+def _decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, str]:
+    try:
+        cursor_sort, cursor_order, value, worker_id = decode_cursor(cursor, 4)
+    except InvalidCursorError:
+        raise InvalidSearchError("Invalid cursor")
+    if not isinstance(value, (int, float)) or not isinstance(worker_id, str):
+        raise InvalidSearchError("Invalid cursor")
+    if cursor_sort != sort_by or cursor_order != order:
+        raise InvalidSearchError("Cursor does not match the requested sort")
+    return value, worker_id
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    """Validate a comma separated `fields=` value (WorkerSummary columns by default)"""
+    try:
+        return parse_projection(fields, WORKER_INDEX_FIELDS, WORKER_SUMMARY_FIELDS)
+    except InvalidFieldsError as e:
+        raise InvalidSearchError(str(e))
+
+class WorkerSearchIndex:
+    """
+    In-memory index of verified workers bucketed by (category_id, location_id).
+
+    Sorted orderings are built on first use per filter/sort combination and
+    dropped whenever a worker changes, so reads are a bisect plus a slice.
+    `version` changes with every such change (and differs between processes),
+    so it can tag search responses without running the search.
+    """
+
+    def __init__(self):
+        self._workers: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[Tuple[Optional[str], Optional[str]], Set[str]] = {}
+        self._orderings: Dict[tuple, Tuple[List[tuple], List[str]]] = {}
+        self._instance = uuid.uuid4().hex
+        self._generation = 0
+        self.loaded = False
+
+    @property
+    def version(self) -> str:
+        return f"{self._instance}:{self._generation}"
+
+    def _changed(self) -> None:
+        self._orderings.clear()
+        self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def rebuild(self, rows: Iterable[Dict[str, Any]]) -> None:
+        workers: Dict[str, Dict[str, Any]] = {}
+        buckets: Dict[Tuple[Optional[str], Optional[str]], Set[str]] = {}
+        for row in rows:
+            if not _is_searchable(row):
+                continue
+            worker = _project(row)
+            workers[worker["id"]] = worker
+            buckets.setdefault((worker["category_id"], worker["location_id"]), set()).add(worker["id"])
+        # Periodic rebuilds usually find nothing new; keep the version (and clients' ETags) then
+        if self.loaded and workers == self._workers:
+            return
+        self._workers, self._buckets = workers, buckets
+        self._changed()
+        self.loaded = True
+
+    def remove(self, worker_id: str) -> None:
+        worker = self._workers.pop(worker_id, None)
+        if worker is None:
+            return
+        key = (worker["category_id"], worker["location_id"])
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.discard(worker_id)
+            if not bucket:
+                del self._buckets[key]
+        self._changed()
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """Apply a full users row: index it if searchable, drop it otherwise"""
+        self.remove(row["id"])
+        if not _is_searchable(row):
+            return
+        worker = _project(row)
+        self._workers[worker["id"]] = worker
+        self._buckets.setdefault((worker["category_id"], worker["location_id"]), set()).add(worker["id"])
+        self._changed()
+
+    def update_fields(self, worker_id: str, changes: Dict[str, Any]) -> None:
+        """Apply a partial update to an indexed worker"""
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            return
+        row = dict(worker)
+        row.update(changes)
+        self.upsert(row)
+
+    def _ordering(self, category_id: Optional[str], location_id: Optional[str], sort_by: str, order: str):
+        key = (category_id, location_id, sort_by, order)
+        ordering = self._orderings.get(key)
+        if ordering is not None:
+            return ordering
+        ids: List[str] = []
+        for (bucket_category, bucket_location), bucket in self._buckets.items():
+            if category_id and bucket_category != category_id:
+                continue
+            if location_id and bucket_location != location_id:
+                continue
+            ids.extend(bucket)
+        sign = -1 if order == "desc" else 1
+        keyed = sorted((sign * self._workers[worker_id][sort_by], worker_id) for worker_id in ids)
+        ordering = (keyed, [worker_id for _, worker_id in keyed])
+        self._orderings[key] = ordering
+        return ordering
+
+    def search(
+        self,
+        category_id: Optional[str] = None,
+        location_id: Optional[str] = None,
+        sort_by: str = "average_rating",
+        order: str = "desc",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = WORKER_SUMMARY_FIELDS
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Return one page of workers, the cursor for the next page and the total match count"""
+        if sort_by not in SORT_FIELDS:
+            raise InvalidSearchError(f"sort_by must be one of: {', '.join(SORT_FIELDS)}")
+        if order not in SORT_ORDERS:
+            raise InvalidSearchError("order must be 'asc' or 'desc'")
+        keys, ids = self._ordering(category_id, location_id, sort_by, order)
+        start = 0
+        if cursor:
+            value, worker_id = _decode_cursor(cursor, sort_by, order)
+            sign = -1 if order == "desc" else 1
+            start = bisect.bisect_right(keys, (sign * value, worker_id))
+        page_ids = ids[start:start + limit]
+        items = [{field: self._workers[worker_id][field] for field in fields} for worker_id in page_ids]
+        next_cursor = None
+        if page_ids and start + limit < len(ids):
+            last = self._workers[page_ids[-1]]
+            next_cursor = encode_cursor(sort_by, order, last[sort_by], last["id"])
+        return items, next_cursor, len(ids)
+
+worker_index = WorkerSearchIndex()
+
+WorkerLoader = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+_loader: Optional[WorkerLoader] = None
+
+async def refresh_worker_index() -> None:
+    if _loader is None:
+        raise RuntimeError("Worker index loader not configured")
+    worker_index.rebuild(await _loader())
+
+async def ensure_worker_index() -> WorkerSearchIndex:
+    if not worker_index.loaded:
+        await refresh_worker_index()
+    return worker_index
+
+_refresh = PeriodicTask(
+    refresh_worker_index,
+    settings.WORKER_INDEX_REFRESH_SECONDS,
+    "Worker index refresh failed; keeping previous index"
+)
+
+async def start_worker_index(loader: WorkerLoader) -> None:
+    """
+    Load the index at startup and schedule periodic full rebuilds.
+
+    Writes that go through the users repository are applied incrementally in
+    between; the rebuild picks up rows changed outside the API (e.g. manual
+    worker verification).
+    """
+    global _loader
+    _loader = loader
+    try:
+        await refresh_worker_index()
+    except Exception:
+        logger.exception("Initial worker index load failed")
+    _refresh.start()
+
+async def stop_worker_index() -> None:
+    await _refresh.stop()
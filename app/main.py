@@ -1,19 +1,66 @@
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from app.api.v1 import auth, references, services, ws_chat
 from app.core.config import get_settings
+from app.core.supabase import init_pools, close_pools, get_pool_stats
+from app.core.database import init_executor, shutdown_executor
+from app.core.cache import get_cache_stats
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from app.core.reference_data import start_reference_data, stop_reference_data
+from app.core.worker_search import start_worker_index, stop_worker_index
+from app.core.rating_aggregates import start_rating_reconciliation, stop_rating_reconciliation
+from app.repositories import users as users_repo
+from app.chat.hub import chat_hub
+from app.chat.broker import create_broker
+from app.chat.persistence import message_writer
+from app.chat.events import event_queue, start_event_pruning, stop_event_pruning
 from app.middleware.error_handler import validation_exception_handler, http_exception_handler
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import DBProfilingMiddleware
 from app.schemas.response import APIResponse
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import timedelta
 import time
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reuse Supabase clients (and their keep-alive connections) across requests
+    init_pools()
+    # Blocking Supabase calls run here instead of on the event loop
+    init_executor()
+    await start_reference_data()
+    await start_worker_index(users_repo.list_searchable_workers)
+    start_rating_reconciliation()
+    # Chat fan-out across processes (in-process unless CHAT_BROKER=redis)
+    await chat_hub.start(create_broker())
+    message_writer.start()
+    # User events (/ws/events) are stored and pushed off the request path
+    event_queue.start()
+    start_event_pruning()
+    yield
+    await stop_event_pruning()
+    # Publish queued events while the hub can still push them
+    await event_queue.drain()
+    await chat_hub.stop()
+    # Flush chat messages still waiting for their bulk insert
+    await message_writer.drain()
+    await stop_rating_reconciliation()
+    await stop_worker_index()
+    await stop_reference_data()
+    shutdown_executor()
+    close_pools()
+
 app = FastAPI(
     title="Services API",
     description="API for services between workers and clients",
-    version="1.0.0"
+    version=settings.VERSION,
+    lifespan=lifespan,
+    # orjson for every response that still goes through response_model
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -24,6 +71,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Supabase calls per request as Server-Timing headers (only with DB_PROFILING)
+app.add_middleware(DBProfilingMiddleware)
+# Per-route latency/status metrics, served at /metrics (added last so it wraps everything)
+app.add_middleware(MetricsMiddleware)
 
 # Add exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -49,7 +100,7 @@ async def root():
 async def health_check():
     """Health check endpoint that returns uptime and version information"""
     uptime_seconds = time.time() - startup_time
-    uptime_formatted = str(datetime.timedelta(seconds=int(uptime_seconds)))
+    uptime_formatted = str(timedelta(seconds=int(uptime_seconds)))
     
     return APIResponse(
         success=True,
@@ -62,6 +113,40 @@ async def health_check():
         }
     )
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request, Supabase, cache, pool and chat metrics"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/health/pools")
+async def pool_stats():
+    """Supabase client pool usage (in-use, idle and wait time per pool)"""
+    return APIResponse(
+        success=True,
+        data=get_pool_stats()
+    )
+
+@app.get("/health/caches")
+async def cache_stats():
+    """Hit/miss/eviction counters of the in-process caches"""
+    return APIResponse(
+        success=True,
+        data=get_cache_stats()
+    )
+
+@app.get("/health/chat")
+async def chat_stats():
+    """Chat connections, room sizes, queue depth and send latency (aggregated), plus message persistence and user event backlog"""
+    return APIResponse(
+        success=True,
+        data={
+            **chat_hub.stats(),
+            "persistence": message_writer.stats(),
+            "events_pending": event_queue.pending()
+        }
+    )
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080) 
\ No newline at end of file
+    # Protocol-level pings close half-open WebSockets; every client library answers them
+    uvicorn.run(app, host="0.0.0.0", port=8080, ws="websockets", ws_ping_interval=20, ws_ping_timeout=20) 
\ No newline at end of file
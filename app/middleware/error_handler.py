@@ -1,5 +1,5 @@
 from fastapi import Request, status, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 from ..schemas.response import APIResponse, ErrorDetail
@@ -11,7 +11,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         field = ".".join(str(x) for x in error["loc"])
         errors.append(f"{field}: {error['msg']}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content=APIResponse(
             success=False,
@@ -33,7 +33,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     elif exc.status_code == status.HTTP_403_FORBIDDEN:
         error_code = "FORBIDDEN"
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=APIResponse(
             success=False,
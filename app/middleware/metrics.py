@@ -0,0 +1,55 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.metrics import http_request_duration_seconds, http_requests_in_progress, http_requests_total
+
+def route_template(scope: Scope) -> str:
+    """Route path template (e.g. /api/v1/services/request/{request_id}) to keep label cardinality bounded"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for candidate in getattr(router, "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    return "unmatched"
+
+class MetricsMiddleware:
+    """
+    Record latency, status code and in-flight count for every HTTP request.
+
+    Plain ASGI middleware rather than BaseHTTPMiddleware, so responses are
+    not re-wrapped and streaming is untouched. WebSockets are passed through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec(method)
+            route = route_template(scope)
+            http_request_duration_seconds.observe(elapsed, method, route)
+            http_requests_total.inc(method, route, str(status_code))
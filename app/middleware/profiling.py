@@ -0,0 +1,55 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import get_settings
+from ..core.profiling import end_profile, start_profile
+from .metrics import route_template
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class DBProfilingMiddleware:
+    """
+    Count and time the Supabase calls of each HTTP request (DB_PROFILING).
+
+    Results go out as a `Server-Timing` header, and a warning is logged when
+    a route goes over its call or time budget.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.DB_PROFILING:
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = start_profile()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_profile(token)
+            self._check_budget(scope, profile, time.perf_counter() - profile.started)
+
+    def _check_budget(self, scope: Scope, profile, elapsed: float) -> None:
+        route = route_template(scope)
+        call_budget = settings.DB_CALL_BUDGETS.get(route, settings.DB_CALL_BUDGET)
+        db_ms = profile.db_time * 1000
+        if profile.db_calls <= call_budget and db_ms <= settings.DB_TIME_BUDGET_MS:
+            return
+        logger.warning(
+            "%s %s over DB budget: %d calls (budget %d), %.1f ms in DB (budget %.0f ms), %.1f ms total; %s",
+            scope["method"], route, profile.db_calls, call_budget, db_ms,
+            settings.DB_TIME_BUDGET_MS, elapsed * 1000,
+            ", ".join(f"{count}x {name}" for name, (count, _) in profile.by_query().items())
+        )
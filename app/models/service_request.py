@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 class ServiceRequestStatus(str, Enum):
@@ -10,6 +10,14 @@ class ServiceRequestStatus(str, Enum):
     cancelled = "cancelled"
     completed = "completed"
 
+# Statuses a request may move to, each with the statuses it may come from
+STATUS_TRANSITIONS: Dict[ServiceRequestStatus, Tuple[ServiceRequestStatus, ...]] = {
+    ServiceRequestStatus.accepted: (ServiceRequestStatus.pending,),
+    ServiceRequestStatus.rejected: (ServiceRequestStatus.pending,),
+    ServiceRequestStatus.cancelled: (ServiceRequestStatus.pending, ServiceRequestStatus.accepted),
+    ServiceRequestStatus.completed: (ServiceRequestStatus.accepted,),
+}
+
 class ServiceRequestBase(BaseModel):
     worker_id: str = Field(..., description="ID del trabajador")
     description: str = Field(..., min_length=5, max_length=500)
@@ -26,4 +34,27 @@ class ServiceRequestInDB(ServiceRequestBase):
 
 class ServiceRequestResponse(ServiceRequestInDB):
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class ServiceRequestSummary(BaseModel):
+    """Row of a request listing; `description` and `updated_at` are opt-in via `fields=`"""
+    id: str
+    client_id: str
+    worker_id: str
+    status: ServiceRequestStatus
+    created_at: datetime
+
+# Columns a `fields=` projection may select, and the default (summary) projection
+SERVICE_REQUEST_FIELDS = tuple(ServiceRequestInDB.model_fields)
+SERVICE_REQUEST_SUMMARY_FIELDS = tuple(ServiceRequestSummary.model_fields)
+
+class ServiceRequestBatchAction(BaseModel):
+    request_ids: List[str] = Field(..., min_length=1, max_length=100)
+    action: str = Field(..., description="Action: accepted, rejected, cancelled, completed")
+
+class ServiceRequestActionResult(BaseModel):
+    """Outcome of one request in a batch action"""
+    id: str
+    success: bool
+    status: Optional[ServiceRequestStatus] = None  # new status, or the current one when the transition was refused
+    error: Optional[str] = None  # NOT_FOUND or INVALID_TRANSITION
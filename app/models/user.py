@@ -62,4 +62,14 @@ class UserInDB(UserBase):
 
 class UserResponse(UserInDB):
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class WorkerSummary(BaseModel):
+    """Public worker card for listings; contact and identity fields are opt-in via `fields=`"""
+    id: str
+    first_name: str
+    last_name: str
+    location_id: Optional[str] = None
+    category_id: Optional[str] = None
+    average_rating: float = 0
+    ratings_count: int = 0 
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Async data-access layer over Supabase
+"""
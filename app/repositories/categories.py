@@ -0,0 +1,17 @@
+from typing import Any, Dict, List
+
+from ..core.database import run_query
+
+async def list_categories() -> List[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("categories").select("*").order("name").execute(),
+        table="categories", op="select"
+    )
+    return result.data or []
+
+async def category_exists(category_id: str) -> bool:
+    result = await run_query(
+        lambda db: db.table("categories").select("id").eq("id", category_id).execute(),
+        table="categories", op="select"
+    )
+    return bool(result.data)
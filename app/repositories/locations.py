@@ -0,0 +1,17 @@
+from typing import Any, Dict, List
+
+from ..core.database import run_query
+
+async def list_locations() -> List[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("locations").select("*").order("name").execute(),
+        table="locations", op="select"
+    )
+    return result.data or []
+
+async def location_exists(location_id: str) -> bool:
+    result = await run_query(
+        lambda db: db.table("locations").select("id").eq("id", location_id).execute(),
+        table="locations", op="select"
+    )
+    return bool(result.data)
@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+
+from ..core.database import run_query
+
+async def consume_refresh_token(jti: str, user_id: str, expires_at: float) -> bool:
+    """Record a refresh token as used; False if it had already been used"""
+    result = await run_query(
+        lambda db: db.rpc("consume_refresh_token", {
+            "p_jti": jti,
+            "p_user_id": user_id,
+            "p_expires_at": datetime.fromtimestamp(expires_at, timezone.utc).isoformat()
+        }).execute(),
+        admin=True, table="rpc.consume_refresh_token", op="rpc"
+    )
+    return bool(result.data)
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+
+from ..core.database import run_query
+
+async def get_message(message_id: str) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("service_messages").select("id,service_request_id,created_at")
+        .eq("id", message_id).limit(1).execute(),
+        table="service_messages", op="select"
+    )
+    return result.data[0] if result.data else None
+
+async def list_messages_before(
+    service_request_id: str,
+    limit: int,
+    before: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Newest-first page of messages older than `before` (a message row), or the latest ones"""
+    def operation(db):
+        query = db.table("service_messages").select("*").eq("service_request_id", service_request_id)
+        if before is not None:
+            query = query.or_(
+                f'created_at.lt."{before["created_at"]}",'
+                f'and(created_at.eq."{before["created_at"]}",id.lt.{before["id"]})'
+            )
+        # PostgREST takes a single order param: renders as created_at.desc,id.desc
+        return query.order("created_at.desc,id", desc=True).limit(limit).execute()
+
+    result = await run_query(operation, table="service_messages", op="select")
+    return result.data or []
+
+async def list_messages_after(
+    service_request_id: str,
+    after: Dict[str, Any],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Oldest-first page of messages newer than `after` (a message row)"""
+    result = await run_query(
+        lambda db: db.table("service_messages").select("*")
+        .eq("service_request_id", service_request_id)
+        .or_(
+            f'created_at.gt."{after["created_at"]}",'
+            f'and(created_at.eq."{after["created_at"]}",id.gt.{after["id"]})'
+        )
+        .order("created_at,id").limit(limit).execute(),
+        table="service_messages", op="select"
+    )
+    return result.data or []
+
+async def insert_messages(messages: List[Dict[str, Any]]) -> None:
+    """
+    Bulk insert messages that already carry their id.
+
+    Conflicting ids are ignored, so retrying a batch that partially reached
+    the database never duplicates messages.
+    """
+    await run_query(
+        lambda db: db.table("service_messages").upsert(messages, ignore_duplicates=True).execute(),
+        table="service_messages", op="insert"
+    )
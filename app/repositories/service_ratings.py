@@ -0,0 +1,43 @@
+from typing import Any, Dict, List
+
+from ..core.cache import user_cache
+from ..core.database import run_query
+from ..core.worker_search import worker_index
+
+def _apply_aggregate(row: Dict[str, Any]) -> None:
+    user_cache.invalidate(row["worker_id"])
+    worker_index.update_fields(row["worker_id"], {
+        "average_rating": row["average_rating"],
+        "ratings_count": row["ratings_count"]
+    })
+
+async def submit_rating(service_request_id: str, client_id: str, rating: int) -> Dict[str, Any]:
+    """
+    Validate, insert and aggregate a rating in one call to `submit_service_rating`.
+
+    Returns the function row: `status` (ok, not_found, invalid_status,
+    forbidden, already_rated) plus the worker's new aggregate when ok.
+    """
+    result = await run_query(
+        lambda db: db.rpc("submit_service_rating", {
+            "p_service_request_id": service_request_id,
+            "p_client_id": client_id,
+            "p_rating": rating
+        }).execute(),
+        admin=True, table="rpc.submit_service_rating", op="rpc"
+    )
+    row = result.data[0]
+    if row["status"] == "ok":
+        _apply_aggregate(row)
+    return row
+
+async def reconcile_aggregates() -> List[Dict[str, Any]]:
+    """Recompute every worker aggregate in bulk and return the rows that drifted"""
+    result = await run_query(
+        lambda db: db.rpc("reconcile_worker_ratings", {}).execute(),
+        admin=True, table="rpc.reconcile_worker_ratings", op="rpc"
+    )
+    drifted = result.data or []
+    for row in drifted:
+        _apply_aggregate(row)
+    return drifted
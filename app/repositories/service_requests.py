@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..core.cache import request_counts_cache
+from ..core.database import run_query
+
+# Column holding the user on each side of a request, by role
+INBOX_COLUMNS = {"worker": "worker_id", "client": "client_id"}
+
+def _invalidate_counts(row: Dict[str, Any]) -> None:
+    for role, column in INBOX_COLUMNS.items():
+        if row.get(column):
+            request_counts_cache.invalidate((role, row[column]))
+
+async def create_service_request(request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("service_requests").insert(request_data).execute(),
+        table="service_requests", op="insert"
+    )
+    if not result.data:
+        return None
+    _invalidate_counts(result.data[0])
+    return result.data[0]
+
+# Enough to authorize a chat participant and check the room status
+PARTICIPANT_COLUMNS = "id,client_id,worker_id,status"
+
+async def get_service_request(service_request_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("service_requests").select(columns).eq("id", service_request_id).limit(1).execute(),
+        table="service_requests", op="select"
+    )
+    return result.data[0] if result.data else None
+
+async def get_worker_statuses(service_request_ids: Sequence[str], worker_id: str) -> Dict[str, str]:
+    """Current status of those of `service_request_ids` that belong to the worker"""
+    result = await run_query(
+        lambda db: db.table("service_requests").select("id,status")
+        .in_("id", list(service_request_ids)).eq("worker_id", worker_id).execute(),
+        table="service_requests", op="select"
+    )
+    return {row["id"]: row["status"] for row in result.data or []}
+
+async def list_service_requests(
+    role: str,
+    user_id: str,
+    limit: int,
+    columns: str = "*",
+    before: Optional[Dict[str, Any]] = None,
+    statuses: Optional[Sequence[str]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Newest-first page of a user's inbox: the requests they are the `role` side
+    of, older than `before` (a row with created_at and id). `columns` must
+    include created_at and id for the next page to be addressable.
+    """
+    def operation(db):
+        query = db.table("service_requests").select(columns).eq(INBOX_COLUMNS[role], user_id)
+        if statuses:
+            query = query.in_("status", list(statuses))
+        if created_from is not None:
+            query = query.gte("created_at", created_from.isoformat())
+        if created_to is not None:
+            query = query.lt("created_at", created_to.isoformat())
+        if before is not None:
+            query = query.or_(
+                f'created_at.lt."{before["created_at"]}",'
+                f'and(created_at.eq."{before["created_at"]}",id.lt.{before["id"]})'
+            )
+        # Renders as created_at.desc,id.desc, the order of the inbox indexes
+        return query.order("created_at.desc,id", desc=True).limit(limit).execute()
+
+    result = await run_query(operation, table="service_requests", op="select")
+    return result.data or []
+
+async def get_status_counts(role: str, user_id: str) -> Dict[str, int]:
+    """Requests per status on the user's `role` side; statuses without requests are absent"""
+    key = (role, user_id)
+    counts = request_counts_cache.get(key)
+    if counts is not None:
+        return counts
+    result = await run_query(
+        lambda db: db.rpc("service_request_status_counts", {"p_user_id": user_id, "p_role": role}).execute(),
+        admin=True, table="rpc.service_request_status_counts", op="rpc"
+    )
+    counts = {row["status"]: row["count"] for row in result.data or []}
+    request_counts_cache.set(key, counts)
+    return counts
+
+async def transition_service_requests(
+    service_request_ids: Sequence[str],
+    worker_id: str,
+    status: str,
+    from_statuses: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """
+    Move the worker's requests to `status` in one conditional UPDATE: only rows
+    currently in `from_statuses` change, so concurrent actions cannot race past
+    the state machine. Returns the rows that changed.
+    """
+    result = await run_query(
+        lambda db: db.table("service_requests").update({"status": status})
+        .in_("id", list(service_request_ids)).eq("worker_id", worker_id)
+        .in_("status", list(from_statuses)).execute(),
+        table="service_requests", op="update"
+    )
+    rows = result.data or []
+    for row in rows:
+        _invalidate_counts(row)
+    return rows
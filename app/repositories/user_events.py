@@ -0,0 +1,28 @@
+from typing import Any, Dict, List
+
+from ..core.database import run_query
+
+async def insert_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert events (user_id, type, payload) and return the stored rows with their id"""
+    result = await run_query(
+        lambda db: db.table("user_events").insert(events).execute(),
+        admin=True, table="user_events", op="insert"
+    )
+    return result.data or []
+
+async def list_events_after(user_id: str, after_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Oldest-first page of a user's events with an id greater than `after_id`"""
+    result = await run_query(
+        lambda db: db.table("user_events").select("id,type,payload,created_at")
+        .eq("user_id", user_id).gt("id", after_id).order("id").limit(limit).execute(),
+        admin=True, table="user_events", op="select"
+    )
+    return result.data or []
+
+async def prune_events(keep_days: int) -> int:
+    """Delete events older than `keep_days` in one call to `prune_user_events`"""
+    result = await run_query(
+        lambda db: db.rpc("prune_user_events", {"p_keep": f"{keep_days} days"}).execute(),
+        admin=True, table="rpc.prune_user_events", op="rpc"
+    )
+    return result.data or 0
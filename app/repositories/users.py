@@ -0,0 +1,108 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from ..core.cache import user_cache
+from ..core.config import get_settings
+from ..core.database import run_blocking, run_query
+from ..core.metrics import db_query_duration_seconds
+from ..core.profiling import record_db_call
+from ..core.supabase import create_auth_client
+from ..core.worker_search import WORKER_INDEX_FIELDS, worker_index
+
+settings = get_settings()
+
+async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("users").select("*").eq("id", user_id).execute(),
+        table="users", op="select"
+    )
+    return result.data[0] if result.data else None
+
+async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("users").select("*").eq("email", email).limit(1).execute(),
+        table="users", op="select"
+    )
+    return result.data[0] if result.data else None
+
+async def email_exists(email: str) -> bool:
+    result = await run_query(
+        lambda db: db.table("users").select("email").eq("email", email).execute(),
+        admin=True, table="users", op="select"
+    )
+    return bool(result.data)
+
+async def insert_user(user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("users").insert(user_data).execute(),
+        admin=True, table="users", op="insert"
+    )
+    if not result.data:
+        return None
+    worker_index.upsert(result.data[0])
+    return result.data[0]
+
+async def update_user(user_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    result = await run_query(
+        lambda db: db.table("users").update(changes).eq("id", user_id).execute(),
+        table="users", op="update"
+    )
+    user_cache.invalidate(user_id)
+    if not result.data:
+        return None
+    worker_index.upsert(result.data[0])
+    return result.data[0]
+
+async def list_searchable_workers() -> List[Dict[str, Any]]:
+    """
+    Verified workers projected to the worker search index columns.
+
+    Read in id-ordered pages until a short one comes back: PostgREST caps
+    every response at max-rows, so a single select would silently truncate.
+    """
+    columns = ",".join(WORKER_INDEX_FIELDS)
+    page_size = settings.WORKER_INDEX_PAGE_SIZE
+    workers: List[Dict[str, Any]] = []
+    while True:
+        start = len(workers)
+        result = await run_query(
+            lambda db: db.table("users").select(columns).eq("role", "worker").eq("is_verified", True)
+            .order("id").range(start, start + page_size - 1).execute(),
+            table="users", op="select"
+        )
+        page = result.data or []
+        workers.extend(page)
+        if len(page) < page_size:
+            return workers
+
+async def create_auth_user(email: str, password: str) -> Optional[str]:
+    """Create a confirmed Supabase auth user and return its id"""
+    response = await run_query(
+        lambda db: db.auth.admin.create_user({
+            "email": email,
+            "password": password,
+            "email_confirm": True  # Auto-confirmar email
+        }),
+        admin=True, table="auth.users", op="create"
+    )
+    return response.user.id if response.user else None
+
+async def delete_auth_user(user_id: str) -> None:
+    await run_query(lambda db: db.auth.admin.delete_user(user_id), admin=True, table="auth.users", op="delete")
+
+def _sign_in(email: str, password: str) -> Optional[str]:
+    # Sign-in stores a session on the client, so use a dedicated one
+    with db_query_duration_seconds.time("auth.users", "sign_in"):
+        response = create_auth_client().auth.sign_in_with_password({
+            "email": email,
+            "password": password
+        })
+    return response.user.id if response.user else None
+
+async def authenticate(email: str, password: str) -> Optional[str]:
+    """Check credentials against Supabase auth and return the user id"""
+    started = time.perf_counter()
+    try:
+        return await run_blocking(_sign_in, email, password)
+    finally:
+        record_db_call("auth.users", "sign_in", time.perf_counter() - started)
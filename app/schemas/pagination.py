@@ -0,0 +1,9 @@
+from typing import TypeVar, Generic, Optional, List
+from pydantic import BaseModel
+
+T = TypeVar('T')
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
@@ -0,0 +1,78 @@
+"""
+Concurrent request throughput with Supabase calls inline vs. offloaded.
+
+    python -m benchmarks.bench_db_offload [--requests 200] [--latency 0.02]
+
+Drives N concurrent run_query calls against stub clients whose execute()
+blocks like a PostgREST round-trip, once with SUPABASE_OFFLOAD=false and once
+with it on. Reports requests per second and the worst event loop stall seen
+by a 10 ms ticker, which is what every other request waits through.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Settings needs these to import; the benchmark never talks to Supabase
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SECRET_KEY"):
+    os.environ.setdefault(name, "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+class _StubClient:
+    """Stands in for a supabase Client: execute() blocks for one round-trip"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return None
+
+async def _ticker(stop: asyncio.Event, stalls: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - started - 0.01)
+
+async def _run(label: str, requests: int) -> None:
+    from app.core.database import run_query
+
+    stop = asyncio.Event()
+    stalls: list = []
+    ticker = asyncio.create_task(_ticker(stop, stalls))
+    # Let the ticker take its first measurement before the load starts
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_query(lambda db: db.execute(), table="bench", op="select")
+        for _ in range(requests)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    print(f"{label:<9} {requests / elapsed:8.1f} req/s   max loop stall {max(stalls, default=0) * 1000:7.1f} ms")
+
+async def main() -> None:
+    from app.core import database, supabase
+
+    supabase.create_client = lambda url, key: _StubClient(args.latency)
+    settings = database.settings
+    print(f"{args.requests} concurrent queries, {args.latency * 1000:.0f} ms per round-trip, "
+          f"pool size {settings.SUPABASE_POOL_SIZE}")
+    try:
+        settings.SUPABASE_OFFLOAD = False
+        await _run("inline", args.requests)
+        settings.SUPABASE_OFFLOAD = True
+        database.init_executor()
+        await _run("offload", args.requests)
+    finally:
+        database.shutdown_executor()
+        supabase.close_pools()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds each stub round-trip blocks")
+    args = parser.parse_args()
+    asyncio.run(main())
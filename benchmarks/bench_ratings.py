@@ -0,0 +1,142 @@
+"""
+Rating submissions under load for a worker holding 10k+ ratings.
+
+    python -m benchmarks.bench_ratings --worker-id UUID --client-id UUID [--ratings 10000] [--submissions 200] [--concurrency 20]
+
+Unlike the other benchmarks this one needs a real, non-production Supabase
+project (.env) with the migrations applied. It seeds `--ratings` completed
+requests and ratings for the worker, then fires concurrent
+submit_service_rating calls and the previous path (download every rating of
+the worker and average them in Python) with the same concurrency. It ends
+with reconcile_worker_ratings, which must find no drift after the
+concurrent submissions, and deletes everything it created unless --keep.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Rows created here carry this description, so a failed run can be cleaned up by hand
+MARKER = "bench_ratings load test"
+CHUNK = 500
+
+async def _insert(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from app.core.database import run_query
+
+    inserted: List[Dict[str, Any]] = []
+    for start in range(0, len(rows), CHUNK):
+        chunk = rows[start:start + CHUNK]
+        result = await run_query(
+            lambda db: db.table(table).insert(chunk).execute(),
+            admin=True, table=table, op="insert"
+        )
+        inserted.extend(result.data or [])
+    return inserted
+
+async def _create_requests(worker_id: str, client_id: str, count: int) -> List[str]:
+    rows = await _insert("service_requests", [
+        {"client_id": client_id, "worker_id": worker_id, "description": MARKER, "status": "completed"}
+        for _ in range(count)
+    ])
+    return [row["id"] for row in rows]
+
+async def _seed(worker_id: str, client_id: str, count: int) -> None:
+    request_ids = await _create_requests(worker_id, client_id, count)
+    await _insert("service_ratings", [
+        {"service_request_id": request_id, "worker_id": worker_id, "client_id": client_id, "rating": random.randint(1, 5)}
+        for request_id in request_ids
+    ])
+
+async def _cleanup(worker_id: str) -> None:
+    from app.core.database import run_query
+
+    result = await run_query(
+        lambda db: db.table("service_requests").select("id")
+        .eq("worker_id", worker_id).eq("description", MARKER).execute(),
+        admin=True, table="service_requests", op="select"
+    )
+    request_ids = [row["id"] for row in result.data or []]
+    # Short chunks: the ids travel in the query string
+    for start in range(0, len(request_ids), 100):
+        chunk = request_ids[start:start + 100]
+        await run_query(
+            lambda db: db.table("service_ratings").delete().in_("service_request_id", chunk).execute(),
+            admin=True, table="service_ratings", op="delete"
+        )
+        await run_query(
+            lambda db: db.table("service_requests").delete().in_("id", chunk).execute(),
+            admin=True, table="service_requests", op="delete"
+        )
+
+async def _load(label: str, calls: List[Callable[[], Awaitable[Any]]], concurrency: int) -> List[Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def timed(call):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await call()
+            latencies.append(time.perf_counter() - started)
+            return result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(timed(call) for call in calls))
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{label:<22} {len(calls) / elapsed:8.1f} ratings/s   "
+          f"p50 {cuts[49] * 1000:7.1f} ms   p95 {cuts[94] * 1000:7.1f} ms   max {max(latencies) * 1000:7.1f} ms")
+    return results
+
+async def main() -> None:
+    from app.core.database import run_query, shutdown_executor
+    from app.core.supabase import close_pools
+    from app.repositories import service_ratings as service_ratings_repo
+
+    worker_id, client_id = args.worker_id, args.client_id
+    try:
+        print(f"Seeding {args.ratings} ratings for worker {worker_id}...")
+        await _seed(worker_id, client_id, args.ratings)
+        # Fold the seeded rows into ratings_sum/ratings_count
+        await service_ratings_repo.reconcile_aggregates()
+
+        async def legacy_average():
+            result = await run_query(
+                lambda db: db.table("service_ratings").select("rating").eq("worker_id", worker_id).execute(),
+                table="service_ratings", op="select"
+            )
+            ratings = [row["rating"] for row in result.data or []]
+            return sum(ratings) / len(ratings) if ratings else 0
+
+        request_ids = await _create_requests(worker_id, client_id, args.submissions)
+        print(f"{args.submissions} submissions, concurrency {args.concurrency}")
+        await _load("previous (read all)", [legacy_average] * args.submissions, args.concurrency)
+        rows = await _load("submit_service_rating", [
+            lambda request_id=request_id: service_ratings_repo.submit_rating(request_id, client_id, random.randint(1, 5))
+            for request_id in request_ids
+        ], args.concurrency)
+        failed = [row["status"] for row in rows if row["status"] != "ok"]
+        if failed:
+            print(f"  {len(failed)} submissions not ok: {sorted(set(failed))}")
+        print(f"  worker now at {max(row['ratings_count'] or 0 for row in rows)} ratings")
+        # Concurrent increments must add up to exactly what a full recount finds
+        drifted = await service_ratings_repo.reconcile_aggregates()
+        print(f"reconcile_worker_ratings: {len(drifted)} drifted workers (expected 0)")
+    finally:
+        if not args.keep:
+            await _cleanup(worker_id)
+            await service_ratings_repo.reconcile_aggregates()
+        shutdown_executor()
+        close_pools()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--worker-id", required=True)
+    parser.add_argument("--client-id", required=True)
+    parser.add_argument("--ratings", type=int, default=10000, help="Ratings seeded before the run")
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded rows in place")
+    args = parser.parse_args()
+    asyncio.run(main())
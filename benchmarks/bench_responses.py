@@ -0,0 +1,82 @@
+"""
+Serialization cost of a 1k-worker page response.
+
+    python -m benchmarks.bench_responses [--workers 1000] [--iterations 50]
+
+Compares FastAPI's response_model path (per-row UserResponse, dump,
+re-validate, dump, then json or orjson rendering) with returning
+pre-serialized bytes through app.core.serialization.page_response.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SECRET_KEY"):
+    os.environ.setdefault(name, "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+def _rows(count: int):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"worker{i}@example.com",
+            "first_name": "Worker",
+            "last_name": f"Number{i}",
+            "dni": f"{30000000 + i}",
+            "phone_number": f"11{40000000 + i}",
+            "role": "worker",
+            "location_id": str(uuid.uuid4()),
+            "category_id": str(uuid.uuid4()),
+            "address": None,
+            "is_active": True,
+            "is_verified": True,
+            "average_rating": 4.5,
+            "ratings_count": i,
+        }
+        for i in range(count)
+    ]
+
+def _measure(label: str, render, iterations: int) -> None:
+    size = len(render())
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    elapsed = (time.perf_counter() - started) / iterations
+    print(f"{label:<34} {elapsed * 1000:8.2f} ms/response   {size / 1024:8.1f} KiB")
+
+def main(workers: int, iterations: int) -> None:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.core.serialization import page_response
+    from app.models.user import UserResponse
+    from app.schemas.pagination import CursorPage
+    from app.schemas.response import APIResponse
+
+    rows = _rows(workers)
+    field = create_response_field(name="response", type_=APIResponse[CursorPage[UserResponse]])
+    loop = asyncio.new_event_loop()
+
+    def response_model_path(response_class):
+        def render():
+            payload = APIResponse(success=True, data=CursorPage[UserResponse](items=[UserResponse(**row) for row in rows]))
+            content = loop.run_until_complete(serialize_response(field=field, response_content=payload))
+            return response_class(content).body
+        return render
+
+    print(f"{workers} workers, {iterations} iterations")
+    _measure("response_model + JSONResponse", response_model_path(JSONResponse), iterations)
+    _measure("response_model + ORJSONResponse", response_model_path(ORJSONResponse), iterations)
+    _measure("page_response (cached TypeAdapter)", lambda: page_response(UserResponse, rows).body, iterations)
+    loop.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    main(args.workers, args.iterations)
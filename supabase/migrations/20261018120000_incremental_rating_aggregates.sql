@@ -0,0 +1,137 @@
+-- Incremental worker rating aggregates.
+--
+-- users.ratings_sum keeps the running total so a new rating updates the
+-- aggregate in O(1) instead of re-reading every rating of the worker.
+
+alter table public.users
+    add column if not exists ratings_sum bigint not null default 0;
+
+-- The old check-then-insert could store the same rating twice under concurrent
+-- submissions: keep the lowest id of each (service_request_id, client_id) so
+-- the unique index below can be built. The backfill then recounts without them.
+delete from public.service_ratings r
+using (
+    select id,
+           row_number() over (partition by service_request_id, client_id order by id) as position
+    from public.service_ratings
+) ranked
+where r.id = ranked.id
+  and ranked.position > 1;
+
+-- One rating per service request and client; makes the duplicate check race-free
+create unique index if not exists service_ratings_request_client_key
+    on public.service_ratings (service_request_id, client_id);
+
+create index if not exists service_ratings_worker_id_idx
+    on public.service_ratings (worker_id);
+
+-- Backfill the running sums from the existing ratings
+update public.users u
+set ratings_sum = agg.ratings_sum,
+    ratings_count = agg.ratings_count,
+    average_rating = agg.ratings_sum::double precision / agg.ratings_count
+from (
+    select worker_id, sum(rating) as ratings_sum, count(*) as ratings_count
+    from public.service_ratings
+    group by worker_id
+) agg
+where u.id = agg.worker_id;
+
+-- Validate, insert and aggregate a rating in a single round-trip.
+-- status is one of: ok, not_found, invalid_status, forbidden, already_rated
+create or replace function public.submit_service_rating(
+    p_service_request_id uuid,
+    p_client_id uuid,
+    p_rating integer
+)
+returns table (
+    status text,
+    worker_id uuid,
+    average_rating double precision,
+    ratings_count integer
+)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_request public.service_requests%rowtype;
+    v_inserted integer;
+begin
+    select * into v_request
+    from public.service_requests r
+    where r.id = p_service_request_id;
+
+    if not found then
+        return query select 'not_found'::text, null::uuid, null::double precision, null::integer;
+        return;
+    end if;
+    if v_request.status <> 'completed' then
+        return query select 'invalid_status'::text, v_request.worker_id, null::double precision, null::integer;
+        return;
+    end if;
+    if v_request.client_id <> p_client_id then
+        return query select 'forbidden'::text, v_request.worker_id, null::double precision, null::integer;
+        return;
+    end if;
+
+    insert into public.service_ratings (service_request_id, worker_id, client_id, rating)
+    values (p_service_request_id, v_request.worker_id, p_client_id, p_rating)
+    on conflict (service_request_id, client_id) do nothing;
+
+    get diagnostics v_inserted = row_count;
+    if v_inserted = 0 then
+        return query select 'already_rated'::text, v_request.worker_id, null::double precision, null::integer;
+        return;
+    end if;
+
+    -- Right-hand side sees the pre-update row, so this is a single atomic increment
+    return query
+    update public.users u
+    set ratings_sum = u.ratings_sum + p_rating,
+        ratings_count = u.ratings_count + 1,
+        average_rating = (u.ratings_sum + p_rating)::double precision / (u.ratings_count + 1)
+    where u.id = v_request.worker_id
+    returning 'ok'::text, u.id, u.average_rating::double precision, u.ratings_count::integer;
+end;
+$$;
+
+-- Recompute every worker aggregate from service_ratings and return the rows
+-- that had drifted. Used by the periodic reconciliation job.
+create or replace function public.reconcile_worker_ratings()
+returns table (
+    worker_id uuid,
+    average_rating double precision,
+    ratings_count integer
+)
+language sql
+security definer
+set search_path = public
+as $$
+    with agg as (
+        select w.id as worker_id,
+               coalesce(sum(r.rating), 0) as ratings_sum,
+               count(r.id) as ratings_count
+        from public.users w
+        left join public.service_ratings r on r.worker_id = w.id
+        where w.role = 'worker'
+        group by w.id
+    )
+    update public.users u
+    set ratings_sum = agg.ratings_sum,
+        ratings_count = agg.ratings_count,
+        average_rating = case when agg.ratings_count > 0
+                              then agg.ratings_sum::double precision / agg.ratings_count
+                              else 0 end
+    from agg
+    where u.id = agg.worker_id
+      and (u.ratings_sum is distinct from agg.ratings_sum
+           or u.ratings_count is distinct from agg.ratings_count)
+    returning u.id, u.average_rating::double precision, u.ratings_count::integer;
+$$;
+
+-- Only the backend (service role) may call these
+revoke execute on function public.submit_service_rating(uuid, uuid, integer) from public, anon, authenticated;
+revoke execute on function public.reconcile_worker_ratings() from public, anon, authenticated;
+grant execute on function public.submit_service_rating(uuid, uuid, integer) to service_role;
+grant execute on function public.reconcile_worker_ratings() to service_role;
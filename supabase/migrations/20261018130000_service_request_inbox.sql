@@ -0,0 +1,41 @@
+-- Keyset-paginated service request inboxes.
+--
+-- Each inbox reads one participant's requests newest first, so the indexes
+-- match the (created_at desc, id desc) keyset order used by the API.
+
+create index if not exists service_requests_worker_inbox_idx
+    on public.service_requests (worker_id, created_at desc, id desc);
+
+create index if not exists service_requests_client_inbox_idx
+    on public.service_requests (client_id, created_at desc, id desc);
+
+-- Requests per status for one participant, for inbox badges.
+-- p_role is 'worker' or 'client' (the side of the request the user is on).
+create or replace function public.service_request_status_counts(
+    p_user_id uuid,
+    p_role text
+)
+returns table (
+    status text,
+    count integer
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    -- One branch per role so each can use its inbox index
+    select r.status::text, count(*)::integer
+    from public.service_requests r
+    where p_role = 'worker' and r.worker_id = p_user_id
+    group by r.status
+    union all
+    select r.status::text, count(*)::integer
+    from public.service_requests r
+    where p_role = 'client' and r.client_id = p_user_id
+    group by r.status;
+$$;
+
+-- Only the backend (service role) may call it
+revoke execute on function public.service_request_status_counts(uuid, text) from public, anon, authenticated;
+grant execute on function public.service_request_status_counts(uuid, text) to service_role;
@@ -0,0 +1,38 @@
+-- Per-user event log behind the /ws/events channel.
+--
+-- Every pushed event is stored first, so its id doubles as the resume cursor:
+-- a client that reconnects with since=<last id> gets whatever it missed.
+
+create table if not exists public.user_events (
+    id bigint generated always as identity primary key,
+    user_id uuid not null references public.users (id) on delete cascade,
+    type text not null,
+    payload jsonb not null default '{}'::jsonb,
+    created_at timestamptz not null default now()
+);
+
+-- Replay reads one user's events in id order
+create index if not exists user_events_user_id_id_idx
+    on public.user_events (user_id, id);
+
+-- Only the backend (service role) reads and writes events
+alter table public.user_events enable row level security;
+revoke all on public.user_events from anon, authenticated;
+
+-- Events older than the retention window are never replayed; delete them in bulk
+create or replace function public.prune_user_events(p_keep interval default interval '7 days')
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+    with deleted as (
+        delete from public.user_events
+        where created_at < now() - p_keep
+        returning 1
+    )
+    select count(*)::integer from deleted;
+$$;
+
+revoke execute on function public.prune_user_events(interval) from public, anon, authenticated;
+grant execute on function public.prune_user_events(interval) to service_role;
@@ -0,0 +1,50 @@
+-- Single-use refresh tokens across processes and restarts.
+--
+-- /auth/refresh consumes a refresh token by inserting its jti here; a second
+-- use of the same token (on any API process) finds the row and is rejected.
+-- Rows are only needed until the token would have expired anyway.
+
+create table if not exists public.used_refresh_tokens (
+    jti text primary key,
+    user_id uuid not null references public.users (id) on delete cascade,
+    expires_at timestamptz not null,
+    used_at timestamptz not null default now()
+);
+
+-- Expired rows are pruned per user when that user refreshes again
+create index if not exists used_refresh_tokens_user_id_expires_at_idx
+    on public.used_refresh_tokens (user_id, expires_at);
+
+-- Only the backend (service role) reads and writes used tokens
+alter table public.used_refresh_tokens enable row level security;
+revoke all on public.used_refresh_tokens from anon, authenticated;
+
+-- True when this call consumed the token, false when it had already been used
+create or replace function public.consume_refresh_token(
+    p_jti text,
+    p_user_id uuid,
+    p_expires_at timestamptz
+)
+returns boolean
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_consumed boolean;
+begin
+    insert into public.used_refresh_tokens (jti, user_id, expires_at)
+    values (p_jti, p_user_id, p_expires_at)
+    on conflict (jti) do nothing;
+    v_consumed := found;
+
+    delete from public.used_refresh_tokens
+    where user_id = p_user_id
+      and expires_at < now();
+
+    return v_consumed;
+end;
+$$;
+
+revoke execute on function public.consume_refresh_token(text, uuid, timestamptz) from public, anon, authenticated;
+grant execute on function public.consume_refresh_token(text, uuid, timestamptz) to service_role;
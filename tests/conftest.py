@@ -0,0 +1,8 @@
+import os
+
+# Settings needs these to import; tests never talk to Supabase
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(name, "http://localhost:54321")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.core.background import BatchQueue, PeriodicTask
+
+def test_batches_in_order_and_drains():
+    async def scenario():
+        batches = []
+
+        async def flush(batch):
+            batches.append(list(batch))
+
+        queue = BatchQueue("test", flush, batch_size=3, queue_size=10)
+        assert not queue.offer([0])  # not started: caller writes inline
+        queue.start()
+        assert queue.offer([1, 2, 3, 4])
+        assert queue.offer([5])
+        await queue.drain()
+        assert not queue.offer([6])
+        return batches
+
+    batches = asyncio.run(scenario())
+    assert [item for batch in batches for item in batch] == [1, 2, 3, 4, 5]
+    assert all(len(batch) <= 3 for batch in batches)
+
+def test_offer_is_all_or_nothing_when_full():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def flush(batch):
+            await release.wait()
+
+        queue = BatchQueue("test", flush, batch_size=1, queue_size=2)
+        queue.start()
+        assert queue.offer([1])
+        await asyncio.sleep(0)  # the task takes 1 and blocks in flush
+        assert queue.offer([2, 3])
+        assert not queue.offer([4])
+        assert queue.pending() == 2
+        release.set()
+        await queue.drain()
+        assert queue.pending() == 0
+
+    asyncio.run(scenario())
+
+def test_flush_errors_do_not_stop_the_queue():
+    async def scenario():
+        flushed = []
+
+        async def flush(batch):
+            if batch == [1]:
+                raise RuntimeError("boom")
+            flushed.extend(batch)
+
+        queue = BatchQueue("test", flush, batch_size=1, queue_size=10)
+        queue.start()
+        queue.offer([1, 2])
+        await queue.drain()
+        return flushed
+
+    assert asyncio.run(scenario()) == [2]
+
+def test_periodic_task_survives_failures_and_stops():
+    async def scenario():
+        runs = []
+
+        async def tick():
+            runs.append(len(runs))
+            if len(runs) == 1:
+                raise RuntimeError("boom")
+
+        task = PeriodicTask(tick, 0.01, "tick failed")
+        task.start()
+        while len(runs) < 3:
+            await asyncio.sleep(0.01)
+        await task.stop()
+        assert not task.running
+        stopped_at = len(runs)
+        await asyncio.sleep(0.05)
+        return stopped_at, len(runs)
+
+    stopped_at, total = asyncio.run(scenario())
+    assert stopped_at == total >= 3
+
+def test_periodic_task_disabled_with_zero_interval():
+    async def scenario():
+        async def tick():
+            pass
+
+        task = PeriodicTask(tick, 0, "tick failed")
+        task.start()
+        assert not task.running
+        await task.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,224 @@
+"""
+Chat fan-out across processes through RedisBroker.
+
+The test's ChatHub talks to a second ChatHub running in a spawned
+interpreter, standing in for another uvicorn worker: the two share nothing
+(history buffers, room status cache) except Redis. Needs a local Redis
+(TEST_REDIS_URL, default redis://localhost:6379/15); skipped when none is
+reachable.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import traceback
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+import redis.asyncio as aioredis
+
+from app.chat.broker import RedisBroker
+from app.chat.hub import ChatHub
+
+REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+PROCESS_TIMEOUT = 30.0
+
+class RecordingSocket:
+    """WebSocket double that keeps every frame the hub writes to it"""
+
+    def __init__(self):
+        self.frames = []
+        self.close_code = None
+
+    async def send_text(self, text: str) -> None:
+        self.frames.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+@pytest.fixture(scope="module", autouse=True)
+def require_redis():
+    client = redis.Redis.from_url(REDIS_URL)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"No Redis at {REDIS_URL}")
+    finally:
+        client.close()
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    """Poll `predicate` (sync or async) until it holds; delivery through Redis is asynchronous"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        result = predicate()
+        if asyncio.iscoroutine(result):
+            result = await result
+        if result:
+            return
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+async def subscribers(channel: str) -> int:
+    client = aioredis.Redis.from_url(REDIS_URL)
+    try:
+        return dict(await client.pubsub_numsub(channel)).get(channel.encode(), 0)
+    finally:
+        await client.close()
+
+async def has_subscribers(channel: str, count: int) -> bool:
+    return await subscribers(channel) == count
+
+async def contains(frames, frame) -> bool:
+    return frame in await frames
+
+async def missing(rooms, room_id: str) -> bool:
+    return room_id not in await rooms
+
+async def start_hub(prefix: str) -> ChatHub:
+    hub = ChatHub()
+    await hub.start(RedisBroker(REDIS_URL, channel_prefix=prefix))
+    return hub
+
+async def _serve_hub(prefix: str, conn) -> None:
+    loop = asyncio.get_running_loop()
+    hub = await start_hub(prefix)
+    sockets = {}
+    connections = {}
+    try:
+        while True:
+            # Read commands off the loop so Redis deliveries keep flowing meanwhile
+            command, *args = await loop.run_in_executor(None, conn.recv)
+            if command == "stop":
+                conn.send((True, None))
+                return
+            try:
+                reply = None
+                if command == "join":
+                    name, room_id, user_id = args
+                    sockets[name] = RecordingSocket()
+                    connections[name] = await hub.join(room_id, sockets[name], user_id)
+                elif command == "leave":
+                    await hub.leave(connections.pop(args[0]))
+                elif command == "broadcast":
+                    await hub.broadcast(*args)
+                elif command == "frames":
+                    reply = sockets[args[0]].frames
+                elif command == "rooms":
+                    reply = list(hub.rooms)
+                else:
+                    raise ValueError(f"Unknown command {command!r}")
+                conn.send((True, reply))
+            except Exception:
+                conn.send((False, traceback.format_exc()))
+    finally:
+        await hub.stop()
+
+def _hub_process_main(prefix: str, conn) -> None:
+    asyncio.run(_serve_hub(prefix, conn))
+
+class HubProcess:
+    """A ChatHub in a spawned interpreter, driven over a pipe"""
+
+    def __init__(self, prefix: str):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_hub_process_main, args=(prefix, child_conn), daemon=True)
+        self._process.start()
+
+    def _request(self, command: tuple):
+        self._conn.send(command)
+        if not self._conn.poll(PROCESS_TIMEOUT):
+            raise AssertionError(f"Hub process did not answer {command[0]!r}")
+        ok, reply = self._conn.recv()
+        if not ok:
+            raise AssertionError(f"Hub process failed on {command[0]!r}:\n{reply}")
+        return reply
+
+    async def call(self, *command):
+        return await asyncio.get_running_loop().run_in_executor(None, self._request, command)
+
+    async def frames(self, name: str) -> list:
+        return await self.call("frames", name)
+
+    async def rooms(self) -> list:
+        return await self.call("rooms")
+
+    async def stop(self) -> None:
+        try:
+            if self._process.is_alive():
+                await self.call("stop")
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, self._process.join, 5)
+            if self._process.is_alive():
+                self._process.terminate()
+
+def test_message_and_status_cross_processes():
+    async def scenario():
+        prefix = f"test-chat-{uuid.uuid4().hex}:"
+        room_id = str(uuid.uuid4())
+        channel = prefix + room_id
+        remote = HubProcess(prefix)
+        hub = await start_hub(prefix)
+        socket = RecordingSocket()
+        try:
+            # First local member subscribes each process to the room channel
+            await hub.join(room_id, socket, "client")
+            await remote.call("join", "worker", room_id, "worker")
+            await wait_for(lambda: has_subscribers(channel, 2))
+
+            # A message published by one process reaches the member of the other, both ways
+            await hub.broadcast(room_id, {"id": "m1", "message": "hola"})
+            await wait_for(lambda: contains(remote.frames("worker"), {"id": "m1", "message": "hola"}))
+            await wait_for(lambda: {"id": "m1", "message": "hola"} in socket.frames)
+            await remote.call("broadcast", room_id, {"id": "m2", "message": "chau"})
+            await wait_for(lambda: {"id": "m2", "message": "chau"} in socket.frames)
+
+            # A status change published by one process closes the room in the other
+            await hub.publish_status(room_id, "completed")
+            await wait_for(lambda: contains(remote.frames("worker"), {"type": "status", "status": "completed"}))
+            await wait_for(lambda: contains(remote.frames("worker"), {"error": "CHAT_DISABLED"}))
+            await wait_for(lambda: missing(remote.rooms(), room_id))
+            await wait_for(lambda: room_id not in hub.rooms)
+
+            # Last local member gone: both processes drop the subscription
+            await wait_for(lambda: has_subscribers(channel, 0))
+        finally:
+            await hub.stop()
+            await remote.stop()
+
+    asyncio.run(scenario())
+
+def test_unsubscribes_only_after_last_local_member():
+    async def scenario():
+        prefix = f"test-chat-{uuid.uuid4().hex}:"
+        room_id = str(uuid.uuid4())
+        channel = prefix + room_id
+        remote = HubProcess(prefix)
+        hub = await start_hub(prefix)
+        try:
+            await remote.call("join", "client", room_id, "client")
+            await remote.call("join", "worker", room_id, "worker")
+            await wait_for(lambda: has_subscribers(channel, 1))
+
+            await remote.call("leave", "client")
+            await asyncio.sleep(0.1)
+            assert await subscribers(channel) == 1
+
+            await remote.call("leave", "worker")
+            await wait_for(lambda: has_subscribers(channel, 0))
+
+            # A process without members never receives the room's frames
+            socket = RecordingSocket()
+            await hub.join(room_id, socket, "worker")
+            await wait_for(lambda: has_subscribers(channel, 1))
+            await hub.broadcast(room_id, {"id": "m3", "message": "solo local"})
+            await wait_for(lambda: {"id": "m3", "message": "solo local"} in socket.frames)
+            assert room_id not in await remote.rooms()
+        finally:
+            await hub.stop()
+            await remote.stop()
+
+    asyncio.run(scenario())
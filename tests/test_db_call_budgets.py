@@ -0,0 +1,194 @@
+"""
+Supabase round-trips per request for the hot endpoints.
+
+Every query goes through a stubbed `_with_pooled_client` that answers from
+canned results, and DB_PROFILING reports the calls in the Server-Timing
+header. An endpoint that grows a new round-trip fails its budget here.
+"""
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from app.core import database, reference_data
+from app.core.auth import create_access_token
+from app.core.cache import user_cache
+from app.core.reference_data import ReferenceSnapshot
+from app.core.worker_search import worker_index
+from app.main import app
+from app.middleware import profiling as profiling_middleware
+from app.models.category import CategoryInDB
+from app.models.location import LocationInDB
+
+LOCATION_ID = "loc-1"
+CATEGORY_ID = "cat-1"
+CLIENT_ID = "client-1"
+WORKER_ID = "worker-1"
+NOW = "2026-10-18T12:00:00+00:00"
+
+CLIENT = {
+    "id": CLIENT_ID,
+    "email": "client@example.com",
+    "first_name": "Ana",
+    "last_name": "Cliente",
+    "dni": "12345678",
+    "phone_number": "1155550000",
+    "role": "client",
+    "location_id": LOCATION_ID,
+    "address": "Calle Falsa 123",
+    "is_active": True,
+    "is_verified": None,
+}
+WORKER = {
+    "id": WORKER_ID,
+    "email": "worker@example.com",
+    "first_name": "Juan",
+    "last_name": "Trabajador",
+    "dni": "87654321",
+    "phone_number": "1155551111",
+    "role": "worker",
+    "location_id": LOCATION_ID,
+    "category_id": CATEGORY_ID,
+    "address": None,
+    "is_active": True,
+    "is_verified": True,
+    "average_rating": 4.5,
+    "ratings_count": 2,
+}
+
+_DB_CALLS = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) calls"')
+
+def db_calls_from_headers(headers: Mapping[str, str]) -> Optional[int]:
+    """Number of Supabase calls reported in a response's Server-Timing header"""
+    match = _DB_CALLS.search(headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+def assert_max_db_calls(response: Any, limit: int) -> None:
+    """Fail when an endpoint made more than `limit` Supabase calls"""
+    calls = db_calls_from_headers(response.headers)
+    if calls is None:
+        raise AssertionError("Response has no DB profile; is DB_PROFILING enabled?")
+    if calls > limit:
+        raise AssertionError(
+            f"{calls} Supabase calls, expected at most {limit}: {response.headers['server-timing']}"
+        )
+
+class StubDatabase:
+    """Stands in for the pooled Supabase clients; answers by (table, op)"""
+
+    def __init__(self):
+        self.results: Dict[Tuple[str, str], Any] = {}
+
+    def returns(self, table: str, op: str, data: Any = None, **extra) -> None:
+        self.results[(table, op)] = SimpleNamespace(data=data, **extra)
+
+    def __call__(self, operation, admin: bool, table: str, op: str):
+        try:
+            return self.results[(table, op)]
+        except KeyError:
+            raise AssertionError(f"Unexpected Supabase call: {table}.{op}") from None
+
+@pytest.fixture
+def db(monkeypatch):
+    stub = StubDatabase()
+    monkeypatch.setattr(database, "_with_pooled_client", stub)
+    monkeypatch.setattr(database.settings, "SUPABASE_OFFLOAD", False)
+    monkeypatch.setattr(profiling_middleware.settings, "DB_PROFILING", True)
+    # Warm state, as after startup: reference snapshots and the worker index are in memory
+    location = {"id": LOCATION_ID, "name": "Palermo", "created_at": NOW, "updated_at": NOW}
+    category = {"id": CATEGORY_ID, "name": "Plomería", "description": "Instalaciones y reparaciones",
+                "created_at": NOW, "updated_at": NOW}
+    monkeypatch.setitem(reference_data._snapshots, "locations", ReferenceSnapshot([location], LocationInDB))
+    monkeypatch.setitem(reference_data._snapshots, "categories", ReferenceSnapshot([category], CategoryInDB))
+    worker_index.rebuild([WORKER])
+    user_cache.clear()
+    yield stub
+    user_cache.clear()
+
+@pytest.fixture
+def client():
+    # No `with`: the lifespan would open real pools and background loaders
+    return TestClient(app)
+
+def client_headers() -> Dict[str, str]:
+    token = create_access_token({"sub": CLIENT_ID, "role": "client"})
+    return {"Authorization": f"Bearer {token}"}
+
+def test_register_worker_budget(db, client):
+    db.returns("users", "select", [])
+    db.returns("auth.users", "create", user=SimpleNamespace(id="new-worker"))
+    db.returns("users", "insert", [dict(WORKER, id="new-worker", email="new@example.com", is_verified=False)])
+
+    response = client.post("/api/v1/auth/register/worker", json={
+        "email": "new@example.com",
+        "password": "secret-password",
+        "first_name": "Nuevo",
+        "last_name": "Trabajador",
+        "dni": "11222333",
+        "phone_number": "1155552222",
+        "location_id": LOCATION_ID,
+        "category_id": CATEGORY_ID,
+    })
+
+    assert response.json()["success"] is True
+    # email check, auth user, profile insert
+    assert_max_db_calls(response, 3)
+
+def test_search_workers_budget(db, client):
+    db.returns("users", "select", [CLIENT])
+
+    response = client.get(
+        "/api/v1/references/workers/search",
+        params={"category_id": CATEGORY_ID, "location_id": LOCATION_ID},
+        headers=client_headers()
+    )
+
+    body = response.json()
+    assert body["success"] is True
+    assert [worker["id"] for worker in body["data"]["items"]] == [WORKER_ID]
+    # Only the current user lookup; the search itself is served from the index
+    assert_max_db_calls(response, 1)
+
+def test_search_workers_cached_user_budget(db, client):
+    db.returns("users", "select", [CLIENT])
+    headers = client_headers()
+    client.get(
+        "/api/v1/references/workers/search",
+        params={"category_id": CATEGORY_ID, "location_id": LOCATION_ID},
+        headers=headers
+    )
+
+    response = client.get(
+        "/api/v1/references/workers/search",
+        params={"category_id": CATEGORY_ID, "location_id": LOCATION_ID, "sort_by": "ratings_count"},
+        headers=headers
+    )
+
+    assert response.json()["success"] is True
+    assert_max_db_calls(response, 0)
+
+def test_rate_worker_budget(db, client):
+    db.returns("users", "select", [CLIENT])
+    db.returns("rpc.submit_service_rating", "rpc", [{
+        "status": "ok",
+        "worker_id": WORKER_ID,
+        "average_rating": 4.0,
+        "ratings_count": 3,
+    }])
+
+    response = client.post(
+        "/api/v1/services/request/request-1/rate",
+        json={"rating": 3},
+        headers=client_headers()
+    )
+
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"] == {"average_rating": 4.0, "ratings_count": 3}
+    # current user lookup plus the single submit_service_rating RPC
+    assert_max_db_calls(response, 2)
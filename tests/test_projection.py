@@ -0,0 +1,37 @@
+import json
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("fastapi")
+
+from app.core.projection import typed_rows
+from app.core.serialization import page_response
+from app.models.service_request import ServiceRequestInDB, ServiceRequestSummary
+
+ROW = {
+    "id": "3f1c8a9e-8d1e-4a49-9a0b-6f2f1c7c2d10",
+    "client_id": "client-1",
+    "worker_id": "worker-1",
+    "status": "pending",
+    "created_at": "2026-10-18T12:00:00.123456+00:00",
+}
+
+def first_item(response) -> Dict[str, Any]:
+    return json.loads(response.body)["data"]["items"][0]
+
+def test_fields_projection_formats_like_the_summary():
+    summary = first_item(page_response(ServiceRequestSummary, [ROW]))
+    projected = first_item(page_response(Dict[str, Any], typed_rows(ServiceRequestInDB, [ROW])))
+
+    assert projected == summary
+    assert projected["created_at"].endswith("Z")
+
+def test_typed_rows_keeps_nulls_and_skips_field_constraints():
+    row = dict(ROW, description="hey", updated_at=None)
+
+    typed = typed_rows(ServiceRequestInDB, [row])[0]
+
+    assert typed["description"] == "hey"
+    assert typed["updated_at"] is None
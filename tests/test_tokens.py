@@ -0,0 +1,93 @@
+"""
+The stdlib HS256 backend (JWT_BACKEND=fast) must accept and reject exactly
+the tokens python-jose does, and produce the same tokens.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("jose")
+
+from jose import jwt
+
+from app.core.tokens import (
+    REFRESH_TOKEN_TYPE, InvalidTokenError, TokenService, _HS256Backend, _JoseBackend
+)
+
+SECRET = "test-secret-key"
+
+jose_backend = _JoseBackend(SECRET, "HS256")
+fast_backend = _HS256Backend(SECRET)
+
+def claims(**overrides):
+    base = {
+        "sub": "user-1",
+        "role": "client",
+        "jti": "0123456789abcdef",
+        "exp": datetime.utcnow() + timedelta(minutes=5),
+    }
+    base.update(overrides)
+    return {name: value for name, value in base.items() if value is not None}
+
+def outcome(backend, token):
+    """Decoded claims, or None when the backend rejects the token"""
+    try:
+        return backend.decode(token)
+    except InvalidTokenError:
+        return None
+
+def test_encode_matches_jose():
+    payload = claims(iat=datetime.utcnow(), nbf=datetime.utcnow() - timedelta(seconds=1), extra=[1, "a"])
+
+    assert fast_backend.encode(payload) == jose_backend.encode(payload)
+
+def test_valid_token_decodes_the_same():
+    token = jose_backend.encode(claims(iat=datetime.utcnow()))
+
+    decoded = outcome(fast_backend, token)
+    assert decoded is not None
+    assert decoded == outcome(jose_backend, token)
+
+@pytest.mark.parametrize("token", [
+    pytest.param(jwt.encode(claims(exp=datetime.utcnow() - timedelta(seconds=5)), SECRET, algorithm="HS256"), id="expired"),
+    pytest.param(jwt.encode(claims(nbf=datetime.utcnow() + timedelta(minutes=1)), SECRET, algorithm="HS256"), id="nbf"),
+    pytest.param(jwt.encode(claims(), "another-secret", algorithm="HS256"), id="bad-signature"),
+    pytest.param(jwt.encode(claims(), SECRET, algorithm="HS512"), id="wrong-alg"),
+    pytest.param(jwt.encode(claims(aud="other-service"), SECRET, algorithm="HS256"), id="aud"),
+    pytest.param(jwt.encode(claims(sub=123), SECRET, algorithm="HS256"), id="non-string-sub"),
+    pytest.param(jwt.encode(claims(jti=["a"]), SECRET, algorithm="HS256"), id="non-string-jti"),
+    pytest.param(jwt.encode(claims(iat="yesterday"), SECRET, algorithm="HS256"), id="bad-iat"),
+    pytest.param("not-a-token", id="malformed"),
+])
+def test_both_backends_reject(token):
+    assert outcome(jose_backend, token) is None
+    assert outcome(fast_backend, token) is None
+
+def test_tampered_payload_is_rejected():
+    header, _, signature = jose_backend.encode(claims()).split(".")
+    _, payload, _ = jose_backend.encode(claims(role="admin")).split(".")
+    token = ".".join((header, payload, signature))
+
+    assert outcome(jose_backend, token) is None
+    assert outcome(fast_backend, token) is None
+
+@pytest.mark.parametrize("backend", ["jose", "fast"])
+def test_refresh_token_only_accepted_as_refresh(backend):
+    service = TokenService(SECRET, "HS256", backend)
+    assert service.backend == backend
+    token = service.create_refresh_token("user-1", "client")
+
+    with pytest.raises(InvalidTokenError):
+        service.decode(token)
+    payload = service.decode_refresh(token)
+    assert payload["type"] == REFRESH_TOKEN_TYPE
+    assert payload["sub"] == "user-1"
+
+@pytest.mark.parametrize("backend", ["jose", "fast"])
+def test_access_token_not_accepted_as_refresh(backend):
+    service = TokenService(SECRET, "HS256", backend)
+    token = service.create_access_token({"sub": "user-1", "role": "client"})
+
+    assert service.decode(token)["sub"] == "user-1"
+    with pytest.raises(InvalidTokenError):
+        service.decode_refresh(token)
@@ -0,0 +1,87 @@
+"""
+The worker search index is loaded in pages, so it never stops at the
+PostgREST max-rows cap.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+# Not "supabase": the supabase/ migrations folder imports as a namespace package
+pytest.importorskip("postgrest")
+
+from app.core import database
+from app.repositories import users as users_repo
+
+class FakeQuery:
+    """Enough of the postgrest builder for the loader; returns at most `max_rows` rows like PostgREST"""
+
+    def __init__(self, rows: List[Dict[str, Any]], max_rows: int, ranges: List[Tuple[int, int]]):
+        self._rows = rows
+        self._max_rows = max_rows
+        self._ranges = ranges
+        self._filters: List[Tuple[str, Any]] = []
+        self._order = None
+        self._range = (0, len(rows) - 1)
+
+    def select(self, columns: str) -> "FakeQuery":
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append((column, value))
+        return self
+
+    def order(self, column: str) -> "FakeQuery":
+        self._order = column
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self._range = (start, end)
+        self._ranges.append((start, end))
+        return self
+
+    def execute(self) -> SimpleNamespace:
+        rows = [row for row in self._rows if all(row.get(column) == value for column, value in self._filters)]
+        if self._order:
+            rows.sort(key=lambda row: row[self._order])
+        start, end = self._range
+        return SimpleNamespace(data=rows[start:end + 1][:self._max_rows])
+
+def worker(number: int, **overrides) -> Dict[str, Any]:
+    row = {"id": f"worker-{number:05d}", "role": "worker", "is_verified": True}
+    row.update(overrides)
+    return row
+
+@pytest.fixture
+def table(monkeypatch):
+    rows: List[Dict[str, Any]] = []
+    ranges: List[Tuple[int, int]] = []
+
+    def with_client(operation, admin, table_name, op):
+        client = SimpleNamespace(table=lambda name: FakeQuery(rows, max_rows=1000, ranges=ranges))
+        return operation(client)
+
+    monkeypatch.setattr(database, "_with_pooled_client", with_client)
+    monkeypatch.setattr(database.settings, "SUPABASE_OFFLOAD", False)
+    monkeypatch.setattr(users_repo.settings, "WORKER_INDEX_PAGE_SIZE", 1000)
+    return SimpleNamespace(rows=rows, ranges=ranges)
+
+def test_loads_every_page_past_max_rows(table):
+    table.rows.extend(worker(number) for number in range(2500))
+    table.rows.append(worker(9999, is_verified=False))
+    table.rows.append(worker(9998, role="client"))
+
+    workers = asyncio.run(users_repo.list_searchable_workers())
+
+    assert len(workers) == 2500
+    assert len({row["id"] for row in workers}) == 2500
+    assert table.ranges == [(0, 999), (1000, 1999), (2000, 2999)]
+
+def test_exact_multiple_of_page_size_ends_on_empty_page(table):
+    table.rows.extend(worker(number) for number in range(2000))
+
+    workers = asyncio.run(users_repo.list_searchable_workers())
+
+    assert len(workers) == 2000
+    assert table.ranges == [(0, 999), (1000, 1999), (2000, 2999)]